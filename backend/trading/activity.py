@@ -0,0 +1,63 @@
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+DEFAULT_ACTIVITY_GRANULARITY = 60
+
+VISIT_CACHE_PREFIX = 'trading:session-visits:'
+
+
+def activity_granularity():
+    return timedelta(seconds=getattr(settings, 'SESSION_ACTIVITY_GRANULARITY', DEFAULT_ACTIVITY_GRANULARITY))
+
+
+def last_activity(session):
+    value = session.get('last_activity')
+    if not value:
+        return None
+    try:
+        return timezone.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def touch_activity(session, now=None):
+    """Store the activity timestamp only when the stored one is older than the
+    granularity; returns True when the session was marked for saving"""
+    now = now or timezone.now()
+    previous = last_activity(session)
+    if previous is not None and now - previous < activity_granularity():
+        return False
+    session['last_activity'] = now.isoformat()
+    return True
+
+
+def count_visit(request):
+    """Count a page visit for this session without forcing a session write.
+
+    Visits accumulate in the cache and are folded into ``visit_count`` on
+    requests that save the session anyway (see touch_activity). Returns the
+    running total.
+    """
+    session = request.session
+    stored = session.get('visit_count', 0)
+    if not session.session_key:
+        session['visit_count'] = stored + 1
+        return stored + 1
+
+    # Signed-cookie session keys are the whole cookie, too long for a cache key
+    key = VISIT_CACHE_PREFIX + hashlib.sha1(session.session_key.encode()).hexdigest()
+    cache.add(key, 0, settings.SESSION_COOKIE_AGE)
+    try:
+        pending = cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, settings.SESSION_COOKIE_AGE)
+        pending = 1
+
+    if session.modified:
+        session['visit_count'] = stored + pending
+        cache.delete(key)
+    return stored + pending
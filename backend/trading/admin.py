@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Inventory, TimeLog, Sale, BuyItem
+from .thumbnails import thumbnail_url
+from .models import (
+    ImportJob, Inventory, InventorySummary, ReorderForecast, StockCheckpoint, StockMovement, TimeLog, Sale, BuyItem,
+    DailySalesRollup, DailyPurchaseRollup,
+)
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
@@ -63,8 +67,10 @@ class InventoryAdmin(admin.ModelAdmin):
     def item_picture_display(self, obj):
         if obj.item_picture:
             return format_html(
-                '<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 5px;" />',
-                obj.item_picture.url
+                '<picture><source srcset="{}" type="image/webp">'
+                '<img src="{}" width="50" height="50" loading="lazy" style="object-fit: cover; border-radius: 5px;" /></picture>',
+                thumbnail_url(obj.item_picture, 'admin', 'webp'),
+                thumbnail_url(obj.item_picture, 'admin', 'jpg'),
             )
         return format_html(
             '<div style="width: 50px; height: 50px; background-color: #f8f9fa; border-radius: 5px; display: flex; align-items: center; justify-content: center; color: #6c757d; font-size: 12px;">No Image</div>'
@@ -135,7 +141,7 @@ class SaleAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Sale Information', {
-            'fields': ('cashier', 'item', 'quantity_sold', 'unit_price', 'total_amount')
+            'fields': ('cashier', 'item', 'quantity_sold', 'unit_price', 'total_amount', 'unit_cost')
         }),
         ('Customer Details', {
             'fields': ('customer_name', 'payment_method')
@@ -169,4 +175,62 @@ class BuyItemAdmin(admin.ModelAdmin):
             'fields': ('purchase_date', 'notes'),
             'classes': ('collapse',)
         }),
-    ) 
\ No newline at end of file
+    ) 
+
+@admin.register(InventorySummary)
+class InventorySummaryAdmin(admin.ModelAdmin):
+    list_display = ['total_items', 'total_value', 'low_stock_items', 'out_of_stock_items', 'last_rebuilt']
+    readonly_fields = ['total_items', 'total_value', 'low_stock_items', 'out_of_stock_items', 'last_rebuilt']
+    
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'cashier', 'transaction_count', 'units', 'amount']
+    list_filter = ['day', 'cashier']
+    date_hierarchy = 'day'
+
+@admin.register(DailyPurchaseRollup)
+class DailyPurchaseRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'buyer', 'transaction_count', 'units', 'amount']
+    list_filter = ['day', 'buyer']
+    date_hierarchy = 'day'
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'original_name', 'user', 'status', 'rows_done', 'total_rows', 'imported_count', 'updated_count', 'error_count', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['started_at', 'heartbeat_at', 'finished_at', 'created_at']
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'item', 'reason', 'quantity_change', 'unit_cost', 'reference', 'user']
+    list_filter = ['reason', 'created_at']
+    search_fields = ['item__item_name', 'reference']
+    date_hierarchy = 'created_at'
+    list_select_related = ['item', 'user']
+    
+    # The ledger is append-only; fix mistakes with a new movement
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(StockCheckpoint)
+class StockCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['as_of', 'item', 'quantity', 'unit_cost']
+    date_hierarchy = 'as_of'
+    list_select_related = ['item']
+
+@admin.register(ReorderForecast)
+class ReorderForecastAdmin(admin.ModelAdmin):
+    list_display = ['item', 'status', 'velocity', 'days_of_cover', 'reorder_point', 'suggested_quantity', 'computed_at']
+    list_filter = ['status']
+    search_fields = ['item__item_name', 'item__brand', 'item__model']
+    list_select_related = ['item']
+    readonly_fields = ['computed_at']
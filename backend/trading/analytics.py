@@ -0,0 +1,235 @@
+"""Sales analytics over the SalesFact table.
+
+SalesFact holds one row per (local day, item, brand, cashier, payment
+method). refresh_sales_facts() folds in Sale rows newer than the
+RefreshWatermark, so a refresh only reads the sales made since the last one.
+Sales that are edited or deleted afterwards are not picked up; run
+`refresh_sales_facts --rebuild` after such corrections.
+
+The watermark only advances past sales at least SETTLE_SECONDS old. A sale
+whose transaction was still open when a refresh ran (and so was invisible to
+it) is therefore still picked up by the next one.
+
+cached_sales_cube() keys its results on the watermark, so cached slices are
+reused until a refresh actually adds sales.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.contrib.auth.models import User
+from .models import Inventory, RefreshWatermark, Sale, SalesFact
+
+SETTLE_SECONDS = 60
+REFRESH_CHUNK_SIZE = 200000
+# Refreshes that add at least this many sales also update the planner statistics
+ANALYZE_THRESHOLD = 10000
+CENT = Decimal('0.01')
+MONEY = DecimalField(max_digits=18, decimal_places=2)
+
+# Dimension name -> (label, column grouped by). Items and cashiers are
+# grouped by id and only the returned rows are labelled, which keeps the
+# joins out of the aggregate.
+DIMENSIONS = {
+    'day': ('Day', 'day'),
+    'week': ('Week', 'week'),
+    'month': ('Month', 'month'),
+    'brand': ('Brand', 'brand'),
+    'item': ('Item', 'item_id'),
+    'cashier': ('Cashier', 'cashier_id'),
+    'payment_method': ('Payment Method', 'payment_method'),
+}
+LABELS = {
+    'item_id': (Inventory, 'item_name'),
+    'cashier_id': (User, 'username'),
+}
+ORDERINGS = {
+    'revenue': '-revenue',
+    'units': '-units',
+    'margin': '-margin',
+    'transactions': '-transaction_count',
+}
+
+
+def fact_key(day, item_id, brand, cashier_id, payment_method):
+    return (day, item_id, brand, cashier_id, payment_method)
+
+
+def aggregate_sales(sales):
+    """Sale rows grouped to the SalesFact grain"""
+    line_cost = ExpressionWrapper(F('quantity_sold') * Coalesce('unit_cost', 'item__unit_cost'), output_field=MONEY)
+    return (
+        sales.order_by()
+        .annotate(fact_day=TruncDate('sale_date', tzinfo=timezone.get_current_timezone()))
+        .values('fact_day', 'item_id', 'item__brand', 'cashier_id', 'payment_method')
+        .annotate(
+            fact_count=Count('id'),
+            fact_units=Coalesce(Sum('quantity_sold'), 0),
+            fact_revenue=Coalesce(Sum('total_amount'), Decimal('0.00'), output_field=MONEY),
+            fact_cost=Coalesce(Sum(line_cost), Decimal('0.00'), output_field=MONEY),
+        )
+    )
+
+
+def merge_facts(groups):
+    """Add aggregated groups onto the existing fact rows, creating the missing ones"""
+    if not groups:
+        return
+    days = [group['fact_day'] for group in groups]
+    existing = {
+        fact_key(fact.day, fact.item_id, fact.brand, fact.cashier_id, fact.payment_method): fact
+        for fact in SalesFact.objects.filter(day__gte=min(days), day__lte=max(days), item_id__in={g['item_id'] for g in groups})
+    }
+    to_create, to_update = [], []
+    for group in groups:
+        key = fact_key(group['fact_day'], group['item_id'], group['item__brand'], group['cashier_id'], group['payment_method'])
+        fact = existing.get(key)
+        if fact is None:
+            day = key[0]
+            fact = SalesFact(
+                day=day, week=day - timedelta(days=day.weekday()), month=day.replace(day=1),
+                item_id=key[1], brand=key[2], cashier_id=key[3], payment_method=key[4],
+                revenue=Decimal('0.00'), cost=Decimal('0.00'),
+            )
+            existing[key] = fact
+            to_create.append(fact)
+        elif fact.pk is not None and fact not in to_update:
+            to_update.append(fact)
+        fact.transaction_count += group['fact_count']
+        fact.units += group['fact_units']
+        fact.revenue = (fact.revenue + Decimal(group['fact_revenue'])).quantize(CENT)
+        fact.cost = (fact.cost + Decimal(group['fact_cost'])).quantize(CENT)
+
+    SalesFact.objects.bulk_create(to_create, batch_size=1000)
+    SalesFact.objects.bulk_update(to_update, ['transaction_count', 'units', 'revenue', 'cost'], batch_size=1000)
+
+
+def refresh_sales_facts(now=None):
+    """Fold settled sales past the watermark into SalesFact; returns the number of sales added"""
+    now = now or timezone.now()
+    RefreshWatermark.objects.get_or_create(key=RefreshWatermark.SALES_FACTS)
+    added = 0
+    while True:
+        position = RefreshWatermark.objects.get(key=RefreshWatermark.SALES_FACTS).position
+        upper = (
+            Sale.objects.filter(id__gt=position, sale_date__lte=now - timedelta(seconds=SETTLE_SECONDS))
+            .aggregate(upper=Max('id'))['upper']
+        )
+        if upper is None:
+            if added >= ANALYZE_THRESHOLD:
+                analyze_sales_facts()
+            return added
+        upper = min(upper, position + REFRESH_CHUNK_SIZE)
+
+        with transaction.atomic():
+            # Moving the watermark first locks it; a concurrent refresh that
+            # read the same position updates nothing and stops
+            claimed = RefreshWatermark.objects.filter(key=RefreshWatermark.SALES_FACTS, position=position).update(
+                position=upper, updated_at=now,
+            )
+            if not claimed:
+                return added
+            groups = list(aggregate_sales(Sale.objects.filter(id__gt=position, id__lte=upper)))
+            merge_facts(groups)
+        added += sum(group['fact_count'] for group in groups)
+
+
+def rebuild_sales_facts():
+    with transaction.atomic():
+        SalesFact.objects.all().delete()
+        RefreshWatermark.objects.update_or_create(key=RefreshWatermark.SALES_FACTS, defaults={'position': 0})
+    added = refresh_sales_facts()
+    analyze_sales_facts()
+    return added
+
+
+def analyze_sales_facts():
+    """Refresh the planner statistics for SalesFact.
+
+    Without them SQLite cannot tell the covering indexes from the unique
+    (day, ...) one and may pick the latter, which costs a table lookup per
+    fact.
+    """
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {connection.ops.quote_name(SalesFact._meta.db_table)}')
+
+
+def sales_cube(start_date=None, end_date=None, group_by=('brand',), brand=None, cashier=None, payment_method=None,
+               item=None, order='revenue', limit=50):
+    """Revenue, units, cost and margin from SalesFact, grouped by DIMENSIONS and filtered by slice values.
+
+    Returns (rows, totals); totals cover every matching fact, not just the first `limit` rows.
+    """
+    facts = SalesFact.objects.all()
+    if start_date:
+        facts = facts.filter(day__gte=start_date)
+    if end_date:
+        facts = facts.filter(day__lte=end_date)
+    if brand:
+        facts = facts.filter(brand__iexact=brand)
+    if cashier:
+        facts = facts.filter(cashier__username=cashier)
+    if payment_method:
+        facts = facts.filter(payment_method=payment_method)
+    if item:
+        matching = Inventory.objects.filter(Q(item_name__icontains=item) | Q(model__icontains=item))
+        facts = facts.filter(item_id__in=matching.values('id'))
+
+    measures = {
+        'transaction_count': Sum('transaction_count'),
+        'units': Sum('units'),
+        'revenue': Coalesce(Sum('revenue'), Decimal('0.00'), output_field=MONEY),
+        'cost': Coalesce(Sum('cost'), Decimal('0.00'), output_field=MONEY),
+    }
+    margin = ExpressionWrapper(F('revenue') - F('cost'), output_field=MONEY)
+
+    columns = [DIMENSIONS[dimension][1] for dimension in group_by]
+    rows = list(
+        facts.order_by()
+        .values(*columns)
+        .annotate(**measures)
+        .annotate(margin=margin)
+        .order_by(ORDERINGS.get(order, '-revenue'), *columns)[:limit]
+    )
+
+    names = {}
+    for column in columns:
+        if column in LABELS:
+            model, field = LABELS[column]
+            names[column] = dict(
+                model.objects.filter(pk__in={row[column] for row in rows}).values_list('pk', field)
+            )
+    results = []
+    for row in rows:
+        row['labels'] = [names[column].get(row[column]) if column in names else row[column] for column in columns]
+        results.append(with_margin_percent(row))
+    totals = facts.order_by().aggregate(**measures)
+    return results, with_margin_percent(totals)
+
+
+def cached_sales_cube(**params):
+    """sales_cube() through the cache, keyed on the watermark so any refresh that adds sales starts afresh"""
+    watermark = RefreshWatermark.objects.filter(key=RefreshWatermark.SALES_FACTS).values_list('position', 'updated_at').first()
+    raw = json.dumps([watermark, sorted(params.items())], default=str)
+    key = 'trading:sales-cube:' + hashlib.md5(raw.encode()).hexdigest()
+    result = cache.get(key)
+    if result is None:
+        result = sales_cube(**params)
+        cache.set(key, result, settings.SALES_ANALYTICS_CACHE_TIMEOUT)
+    return result
+
+
+def with_margin_percent(row):
+    row['transaction_count'] = row['transaction_count'] or 0
+    row['units'] = row['units'] or 0
+    row['margin'] = row['revenue'] - row['cost']
+    row['margin_percent'] = (row['margin'] * 100 / row['revenue']).quantize(Decimal('0.1')) if row['revenue'] else None
+    return row
@@ -0,0 +1,156 @@
+"""Read-only JSON inventory API for the POS terminals and price boards.
+
+GET /api/inventory/ supports the following query parameters:
+
+    brand=Asus,MSI          case-insensitive brand filter (comma separated)
+    stock=in_stock,low_stock,out_of_stock
+    updated_since=2024-05-01T08:00:00+08:00   (or just a date)
+    fields=id,item_name,srp_price             (defaults to API_DEFAULT_FIELDS)
+    limit=50                                  (at most API_MAX_PAGE_SIZE)
+    after=<id>                                keyset cursor; use the "next" link
+
+Responses carry an ETag built from the inventory version counter, which
+moves on every inventory change, deletions included. A poll that sends
+If-None-Match gets a 304 after one small query, without the rows being
+fetched or serialized. There is no Last-Modified header: the newest
+last_updated misses deleted items and items leaving a stock= filter, and
+HTTP dates only have one-second resolution.
+"""
+import hashlib
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import JsonResponse, QueryDict
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import condition, require_GET
+from .models import LOW_STOCK_THRESHOLD, CacheVersion, Inventory, local_day_start
+
+API_FIELDS = [
+    'id', 'item_name', 'brand', 'model', 'description', 'serial_number', 'quantity',
+    'unit_cost', 'srp_price', 'discount_price', 'stock_status', 'date_added', 'last_updated',
+]
+API_DEFAULT_FIELDS = [
+    'id', 'item_name', 'brand', 'model', 'quantity', 'srp_price', 'discount_price', 'stock_status', 'last_updated',
+]
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+STOCK_FILTERS = {
+    'in_stock': Q(quantity__gt=LOW_STOCK_THRESHOLD),
+    'low_stock': Q(quantity__gt=0, quantity__lte=LOW_STOCK_THRESHOLD),
+    'out_of_stock': Q(quantity=0),
+}
+
+
+class ApiError(Exception):
+    pass
+
+
+def split_param(request, name):
+    return [value.strip() for value in request.GET.get(name, '').split(',') if value.strip()]
+
+
+def parse_updated_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ApiError('updated_since must be an ISO date or datetime.')
+        return local_day_start(day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_api_query(request):
+    """Validate the query string into (filtered queryset, fields, limit, after); raises ApiError"""
+    queryset = Inventory.objects.all()
+
+    brands = split_param(request, 'brand')
+    if brands:
+        condition = Q()
+        for brand in brands:
+            condition |= Q(brand__iexact=brand)
+        queryset = queryset.filter(condition)
+
+    stocks = split_param(request, 'stock')
+    if stocks:
+        unknown = [stock for stock in stocks if stock not in STOCK_FILTERS]
+        if unknown:
+            raise ApiError(f"Unknown stock filter(s): {', '.join(unknown)}. Use {', '.join(STOCK_FILTERS)}.")
+        condition = Q()
+        for stock in stocks:
+            condition |= STOCK_FILTERS[stock]
+        queryset = queryset.filter(condition)
+
+    updated_since = request.GET.get('updated_since')
+    if updated_since:
+        queryset = queryset.filter(last_updated__gt=parse_updated_since(updated_since))
+
+    fields = split_param(request, 'fields') or API_DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+
+    try:
+        limit = int(request.GET.get('limit', API_PAGE_SIZE))
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        raise ApiError('limit and after must be integers.')
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        raise ApiError(f'limit must be between 1 and {API_MAX_PAGE_SIZE}.')
+
+    return queryset, fields, limit, after
+
+
+def inventory_etag(request):
+    """Inventory version plus the normalized query string; None for an invalid query"""
+    try:
+        parse_api_query(request)
+    except ApiError:
+        return None
+    params = QueryDict(mutable=True)
+    for key in sorted(request.GET):
+        params.setlist(key, request.GET.getlist(key))
+    version = CacheVersion.get(CacheVersion.INVENTORY_GRID)
+    return hashlib.md5(f"{version}?{params.urlencode()}".encode()).hexdigest()
+
+
+def serialize_items(queryset, fields):
+    """Rows holding exactly the requested fields, in order, plus their ids for the cursor"""
+    db_fields = {field for field in fields if field != 'stock_status'} | {'id'}
+    if 'stock_status' in fields:
+        db_fields.add('quantity')
+
+    rows, ids = [], []
+    for values in queryset.values(*db_fields):
+        if 'stock_status' in fields:
+            values['stock_status'] = Inventory(quantity=values['quantity']).stock_status
+        rows.append({field: values[field] for field in fields})
+        ids.append(values['id'])
+    return rows, ids
+
+
+@login_required
+@require_GET
+@condition(etag_func=inventory_etag)
+def inventory_api(request):
+    try:
+        queryset, fields, limit, after = parse_api_query(request)
+    except ApiError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    rows, ids = serialize_items(queryset.filter(id__gt=after).order_by('id')[:limit + 1], fields)
+    has_next = len(rows) > limit
+
+    next_url = None
+    if has_next:
+        params = request.GET.copy()
+        params['after'] = ids[limit - 1]
+        next_url = f'{request.path}?{params.urlencode()}'
+
+    response = JsonResponse({'success': True, 'results': rows[:limit], 'next': next_url})
+    # Clients may keep the body but must revalidate it on every poll
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
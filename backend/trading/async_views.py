@@ -0,0 +1,174 @@
+"""Async versions of the read-heavy pages and JSON endpoints.
+
+js_it_comp_trad/urls.py routes to these instead of the views in views.py
+when settings.ASYNC_VIEWS is on, which is meant for the ASGI (uvicorn)
+serving mode. Query building and rendering are shared with views.py; only
+the database round trips differ. Independent queries are awaited together
+with asyncio.gather.
+"""
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from .activity import count_visit
+from .models import CacheVersion, DailySalesRollup, ImportJob, InventorySummary, TimeLog
+from .pagination import apaginate, apaginate_keyset, estimated_count
+from .search import get_search_backend
+from .typeahead import suggest
+from .views import (
+    CASHIER_PAGE_SIZE, DASHBOARD_PAGE_SIZE, cashier_queryset, dashboard_grid_key, dashboard_queryset,
+    render_dashboard_grid, sales_history_querysets, time_log_users, time_logs_queryset,
+)
+
+arender = sync_to_async(render)
+
+
+def async_login_required(view):
+    """login_required for coroutine views (Django 4.2's decorator is sync-only)"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Resolving the lazy user loads the session and may query the database
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def ainventory_version():
+    version = await CacheVersion.objects.filter(key=CacheVersion.INVENTORY_GRID).values_list('version', flat=True).afirst()
+    return version or 0
+
+
+async def abuild_dashboard_grid(search_query, sort_by, sort_order, page_number, explicit_sort):
+    search_backend = await sync_to_async(get_search_backend)()
+    inventory_items = dashboard_queryset(search_backend, search_query, sort_by, sort_order, explicit_sort)
+    if search_query:
+        page_obj, stats = await asyncio.gather(
+            apaginate(inventory_items, page_number, DASHBOARD_PAGE_SIZE),
+            sync_to_async(InventorySummary.compute)(inventory_items),
+        )
+    else:
+        page_obj, stats = await apaginate(inventory_items, page_number, DASHBOARD_PAGE_SIZE), None
+    return await sync_to_async(render_dashboard_grid)(page_obj, search_query, sort_by, sort_order, stats)
+
+
+@async_login_required
+async def dashboard(request):
+    search_query = request.GET.get('search', '')
+    sort_by = request.GET.get('sort', 'item_name')
+    sort_order = request.GET.get('order', 'asc')
+    page_number = request.GET.get('page')
+    explicit_sort = 'sort' in request.GET
+
+    visits, version, summary, current_time_log = await asyncio.gather(
+        sync_to_async(count_visit)(request),
+        ainventory_version(),
+        sync_to_async(InventorySummary.current)() if not search_query else asyncio.sleep(0, result=None),
+        TimeLog.objects.filter(user=request.user, is_active=True).afirst(),
+    )
+
+    key = dashboard_grid_key(version, search_query, sort_by, sort_order, page_number, explicit_sort)
+    grid = await cache.aget(key)
+    if grid is None:
+        grid = await abuild_dashboard_grid(search_query, sort_by, sort_order, page_number, explicit_sort)
+        await cache.aset(key, grid, settings.DASHBOARD_GRID_CACHE_TIMEOUT)
+
+    stats = grid['stats'] if search_query else {
+        'total_items': summary.total_items,
+        'total_value': summary.total_value,
+        'low_stock_items': summary.low_stock_items,
+        'out_of_stock_items': summary.out_of_stock_items,
+    }
+
+    context = {
+        'visits': visits,
+        'grid': grid,
+        'search_query': search_query,
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'current_time_log': current_time_log,
+        'session_timeout': settings.SESSION_TIMEOUT,
+        **stats,
+    }
+    return await arender(request, 'dashboard.html', context)
+
+
+@async_login_required
+async def cashier(request):
+    search_query = request.GET.get('search', '')
+    inventory_items = await sync_to_async(cashier_queryset)(search_query)
+    page_obj = await apaginate(inventory_items, request.GET.get('page'), CASHIER_PAGE_SIZE)
+
+    context = {
+        'page_obj': page_obj,
+        'search_query': search_query,
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    return await arender(request, 'cashier.html', context)
+
+
+@async_login_required
+async def cashier_typeahead(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(int(request.GET.get('limit', 10)), 50)
+    except ValueError:
+        limit = 10
+
+    results = await sync_to_async(suggest)(query, limit=limit) if query else []
+    return JsonResponse({'success': True, 'query': query, 'results': results})
+
+
+@async_login_required
+async def sales_history(request):
+    sales, rollups, filters = sales_history_querysets(request)
+    page_obj, totals = await asyncio.gather(
+        apaginate_keyset(sales, request.GET.get('cursor'), 'sale_date'),
+        sync_to_async(DailySalesRollup.totals)(rollups),
+    )
+
+    context = {
+        'page_obj': page_obj,
+        **filters,
+        'total_sales': totals['transaction_count'],
+        'total_revenue': totals['amount'],
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    return await arender(request, 'sales_history.html', context)
+
+
+@async_login_required
+async def time_logs(request):
+    time_logs, user_filter, date_filter = time_logs_queryset(request)
+    show_count = request.GET.get('count') == '1'
+
+    page_obj, total_count, users = await asyncio.gather(
+        apaginate_keyset(time_logs.select_related('user'), request.GET.get('cursor'), 'time_in'),
+        time_logs.acount() if show_count else sync_to_async(estimated_count)(time_logs),
+        sync_to_async(list)(time_log_users()),
+    )
+    page_obj.total_count = total_count
+
+    context = {
+        'page_obj': page_obj,
+        'users': users,
+        'user_filter': user_filter,
+        'date_filter': date_filter,
+        'show_count': show_count,
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    return await arender(request, 'time_logs.html', context)
+
+
+@async_login_required
+async def import_job_status(request, job_id):
+    jobs = ImportJob.objects.all() if request.user.is_staff else ImportJob.objects.filter(user=request.user)
+    job = await jobs.filter(id=job_id).afirst()
+    if job is None:
+        raise Http404('No ImportJob matches the given query.')
+    return JsonResponse({'success': True, 'job': job.to_dict()})
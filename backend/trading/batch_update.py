@@ -0,0 +1,88 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from .models import CacheVersion, Inventory, InventorySummary, StockMovement
+
+PATCH_FIELDS = ('quantity', 'unit_cost', 'srp_price', 'discount_price')
+BATCH_UPDATE_LIMIT = 1000
+
+
+class BatchUpdateError(Exception):
+    def __init__(self, message, errors=None):
+        self.errors = errors or []
+        super().__init__(message)
+
+
+def parse_patches(raw_patches):
+    """Validate [{id, quantity?, unit_cost?, srp_price?, discount_price?}, ...]
+    into {item_id: {field: value}} with the model fields' own cleaning"""
+    if not isinstance(raw_patches, list) or not raw_patches:
+        raise BatchUpdateError('No items to update.')
+    if len(raw_patches) > BATCH_UPDATE_LIMIT:
+        raise BatchUpdateError(f'At most {BATCH_UPDATE_LIMIT} items can be updated at once.')
+
+    patches = {}
+    errors = []
+    for index, raw in enumerate(raw_patches, start=1):
+        try:
+            item_id = int(raw['id'])
+        except (KeyError, TypeError, ValueError):
+            errors.append({'id': None, 'message': f'Line {index}: missing or invalid id.'})
+            continue
+
+        present = [field_name for field_name in PATCH_FIELDS if field_name in raw]
+        if not present:
+            errors.append({'id': item_id, 'message': f'Line {index}: nothing to update.'})
+            continue
+
+        changes = {}
+        for field_name in present:
+            field = Inventory._meta.get_field(field_name)
+            value = raw[field_name]
+            try:
+                changes[field_name] = field.clean(None if value == '' else value, None)
+            except ValidationError as e:
+                errors.append({'id': item_id, 'message': f'{field.verbose_name}: {" ".join(e.messages)}'})
+        patches.setdefault(item_id, {}).update(changes)
+
+    if errors:
+        raise BatchUpdateError('Some items could not be updated; nothing was saved.', errors)
+    return patches
+
+
+def apply_patches(patches, user_id=None):
+    """Apply all patches with one bulk_update in a single transaction.
+
+    Mirrors what Inventory.save() would do for each item: last_updated,
+    InventorySummary deltas, stock movements and the inventory version bump.
+    """
+    now = timezone.now()
+    fields = sorted({field for changes in patches.values() for field in changes})
+
+    with transaction.atomic():
+        items = {item.id: item for item in Inventory.objects.select_for_update().filter(id__in=patches)}
+        missing = [item_id for item_id in patches if item_id not in items]
+        if missing:
+            raise BatchUpdateError(
+                f"Item(s) not found: {', '.join(str(i) for i in missing)}",
+                [{'id': item_id, 'message': 'Item not found.'} for item_id in missing],
+            )
+
+        summary_changes = []
+        movements = []
+        for item_id, changes in patches.items():
+            item = items[item_id]
+            previous = (item.quantity, item.unit_cost)
+            for field, value in changes.items():
+                setattr(item, field, value)
+            item.last_updated = now
+            current = (item.quantity, item.unit_cost)
+            summary_changes.append((previous, current))
+            movements.append(StockMovement.for_change(item_id, previous, current, StockMovement.ADJUSTMENT, 'Batch update', user_id))
+
+        Inventory.objects.bulk_update(items.values(), fields + ['last_updated'])
+        InventorySummary.apply_changes(summary_changes)
+        StockMovement.objects.bulk_create([movement for movement in movements if movement])
+        CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+
+    return [items[item_id] for item_id in patches]
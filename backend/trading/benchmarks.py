@@ -0,0 +1,29 @@
+"""Helpers shared by the benchmark and benchmark_serving commands."""
+import time
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class QueryTimer:
+    """Execute wrapper counting queries and their time in seconds.
+
+    Used with connection.execute_wrapper(); unlike CaptureQueriesContext,
+    whose per-query times are rounded to the millisecond, it keeps
+    perf_counter precision.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.count += 1
@@ -0,0 +1,175 @@
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from . import metrics
+from .models import CacheVersion, DailySalesRollup, Inventory, InventorySummary, Sale, StockMovement
+
+CENT = Decimal('0.01')
+# Largest PositiveIntegerField value every backend accepts
+MAX_QUANTITY = 2 ** 31 - 1
+# Sale text fields a cart may set
+SALE_FIELDS = ('customer_name', 'payment_method', 'notes')
+
+
+class CheckoutError(Exception):
+    pass
+
+
+def fits(field_name, amount):
+    """Whether a Sale decimal field's column can hold the amount"""
+    field = Sale._meta.get_field(field_name)
+    return abs(amount) < 10 ** (field.max_digits - field.decimal_places)
+
+
+class InsufficientStock(CheckoutError):
+    def __init__(self, shortages):
+        self.shortages = shortages
+        names = ', '.join(f"{s['item_name']} (available: {s['available']})" for s in shortages)
+        super().__init__(f'Not enough stock for: {names}')
+
+
+def parse_lines(raw_lines):
+    """Validate [{item_id, quantity, unit_price?}, ...] into (item_id, quantity, unit_price) tuples"""
+    if not isinstance(raw_lines, list) or not raw_lines:
+        raise CheckoutError('The cart is empty.')
+
+    lines = []
+    for index, raw in enumerate(raw_lines, start=1):
+        try:
+            item_id = int(raw['item_id'])
+            quantity = int(raw.get('quantity', 1))
+            unit_price = raw.get('unit_price')
+            unit_price = Decimal(str(unit_price)) if unit_price not in (None, '') else None
+        except (KeyError, TypeError, ValueError, InvalidOperation, AttributeError):
+            raise CheckoutError(f'Line {index}: invalid item, quantity or price.')
+        if quantity <= 0:
+            raise CheckoutError(f'Line {index}: quantity must be greater than 0.')
+        if quantity > MAX_QUANTITY:
+            raise CheckoutError(f'Line {index}: quantity is too large.')
+        if unit_price is not None:
+            if not unit_price.is_finite():
+                raise CheckoutError(f'Line {index}: invalid item, quantity or price.')
+            if unit_price < 0:
+                raise CheckoutError(f'Line {index}: price cannot be negative.')
+            # Checked before and after rounding, which can carry into another digit
+            if not fits('unit_price', unit_price) or not fits('unit_price', unit_price.quantize(CENT)):
+                raise CheckoutError(f'Line {index}: price is too large.')
+            unit_price = unit_price.quantize(CENT)
+        lines.append((item_id, quantity, unit_price))
+    return lines
+
+
+def parse_sale_fields(data):
+    """Validate the cart's customer_name, payment_method and notes against the Sale fields.
+
+    Missing keys get the field default; anything the column could not store
+    (null, non-text, too long, NUL characters) raises CheckoutError.
+    """
+    if not isinstance(data, dict):
+        raise CheckoutError('Invalid request.')
+    fields = {}
+    for name in SALE_FIELDS:
+        field = Sale._meta.get_field(name)
+        if name not in data:
+            fields[name] = field.get_default()
+            continue
+        value = data[name]
+        if not isinstance(value, str) or '\x00' in value:
+            raise CheckoutError(f'{field.verbose_name} must be text.')
+        if field.max_length is not None and len(value) > field.max_length:
+            raise CheckoutError(f'{field.verbose_name} must be at most {field.max_length} characters.')
+        if not value and not field.blank:
+            raise CheckoutError(f'{field.verbose_name} is required.')
+        if field.choices and value and value not in dict(field.flatchoices):
+            raise CheckoutError(f'{field.verbose_name} {value!r} is not a valid choice.')
+        fields[name] = value
+    return fields
+
+
+def checkout(cashier, lines, customer_name='', payment_method='Cash', notes=''):
+    """Sell every line of a cart in one transaction, or nothing at all.
+
+    Stock is decremented with a single conditional UPDATE
+    (``quantity = quantity - n WHERE quantity >= n``), so concurrent
+    checkouts of the same item can never drive stock negative. The query
+    count is fixed regardless of the number of lines.
+    """
+    requested = {}
+    for item_id, quantity, _ in lines:
+        requested[item_id] = requested.get(item_id, 0) + quantity
+
+    try:
+        with transaction.atomic():
+            items = {
+                item['id']: item
+                for item in Inventory.objects.filter(id__in=requested).values('id', 'item_name', 'srp_price', 'unit_cost')
+            }
+            missing = [item_id for item_id in requested if item_id not in items]
+            if missing:
+                raise CheckoutError(f"Item(s) not found: {', '.join(str(i) for i in missing)}")
+
+            decrement = Case(
+                *[When(id=item_id, then=Value(quantity)) for item_id, quantity in requested.items()],
+                output_field=IntegerField(),
+            )
+            updated = Inventory.objects.filter(id__in=requested, quantity__gte=decrement).update(
+                quantity=F('quantity') - decrement,
+                last_updated=timezone.now(),
+            )
+            if updated != len(requested):
+                # At least one line is short: undo the whole cart
+                raise InsufficientStock([])
+
+            remaining = dict(Inventory.objects.filter(id__in=requested).values_list('id', 'quantity'))
+
+            sales = []
+            for index, (item_id, quantity, unit_price) in enumerate(lines, start=1):
+                if unit_price is None:
+                    unit_price = items[item_id]['srp_price']
+                total_amount = quantity * unit_price
+                if not fits('total_amount', total_amount):
+                    raise CheckoutError(f'Line {index}: total of {total_amount} is too large.')
+                sales.append(Sale(
+                    cashier=cashier,
+                    item_id=item_id,
+                    quantity_sold=quantity,
+                    unit_price=unit_price,
+                    total_amount=total_amount,
+                    unit_cost=items[item_id]['unit_cost'],
+                    customer_name=customer_name,
+                    payment_method=payment_method,
+                    notes=notes,
+                ))
+            sales = Sale.objects.bulk_create(sales)
+
+            DailySalesRollup.apply_changes([(None, sale.rollup_entry()) for sale in sales])
+            transaction.on_commit(lambda: metrics.record_sales(len(sales), sum(sale.total_amount for sale in sales)))
+            InventorySummary.apply_changes([
+                (
+                    (remaining[item_id] + quantity, items[item_id]['unit_cost']),
+                    (remaining[item_id], items[item_id]['unit_cost']),
+                )
+                for item_id, quantity in requested.items()
+            ])
+            StockMovement.objects.bulk_create([
+                StockMovement(
+                    item_id=sale.item_id,
+                    reason=StockMovement.SALE,
+                    quantity_change=-sale.quantity_sold,
+                    unit_cost=sale.unit_cost,
+                    reference=f'Sale #{sale.pk}',
+                    user_id=cashier.id,
+                )
+                for sale in sales
+            ])
+            CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+    except InsufficientStock:
+        available = dict(Inventory.objects.filter(id__in=requested).values_list('id', 'quantity'))
+        raise InsufficientStock([
+            {'item_id': item_id, 'item_name': items[item_id]['item_name'], 'available': available.get(item_id, 0)}
+            for item_id, quantity in requested.items()
+            if available.get(item_id, 0) < quantity
+        ])
+
+    return sales
@@ -0,0 +1,169 @@
+"""Reorder forecasting over the SalesFact history, computed in NumPy.
+
+One query pulls units sold per item and local day for the lookback window
+(days with sales only; SalesFact has no rows for days without). The rows
+become three flat arrays -- item position, age in days and units -- and
+every statistic is an np.bincount over them, so the whole catalog is
+forecast at once with no per-item queries and no dense item x day matrix.
+
+For each item, over the days it was on sale (since date_added, or its
+first sale if earlier, within the lookback):
+
+- velocity is an exponentially weighted mean of daily units with a
+  REORDER_HALF_LIFE_DAYS half-life, so recent weeks dominate; days without
+  sales count as zeros;
+- demand_std is the standard deviation of daily units over the last
+  VARIABILITY_DAYS;
+- safety stock covers z standard deviations of demand over the lead time;
+- the reorder point is expected lead-time demand plus safety stock, and an
+  item at or below it is topped up to cover the lead time plus the review
+  period.
+
+Days an item spent out of stock count as days without demand, so items
+that are often out of stock are under-forecast.
+"""
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import CacheVersion, Inventory, ReorderForecast, SalesFact
+
+VARIABILITY_DAYS = 56
+# Items selling less than this many units a day (one a year) have no demand
+MIN_VELOCITY = 1 / 365
+
+
+def ordinals(days):
+    # Much faster than building a datetime64 array from date objects
+    return np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days))
+
+
+def demand_history(start, end):
+    """(item ids, age in days before `end`, units) arrays with one entry per item and day with sales"""
+    rows = list(
+        SalesFact.objects.filter(day__gte=start, day__lte=end)
+        .order_by()
+        .values_list('item_id', 'day')
+        .annotate(total=Sum('units'))
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    item_ids, days, units = zip(*rows)
+    return np.array(item_ids, dtype=np.int64), end.toordinal() - ordinals(days), np.array(units, dtype=np.float64)
+
+
+def catalog(end):
+    """(item ids, quantities, days on sale up to `end`) arrays for every item, ordered by id"""
+    rows = list(
+        Inventory.objects.order_by('id')
+        .annotate(added=TruncDate('date_added', tzinfo=timezone.get_current_timezone()))
+        .values_list('id', 'quantity', 'added')
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    item_ids, quantities, added = zip(*rows)
+    days_on_sale = end.toordinal() - ordinals(added) + 1
+    return np.array(item_ids, dtype=np.int64), np.array(quantities, dtype=np.int64), days_on_sale
+
+
+def forecast_arrays(quantity, days_on_sale, index, ages, units, lookback, half_life, lead_time, review_days,
+                    service_z, overstock_days):
+    """Forecast columns for every item.
+
+    quantity and days_on_sale have one entry per item; index, ages and units
+    one per (item, day) with sales, index being the item's position.
+    """
+    count = len(quantity)
+    first_sale = np.zeros(count, dtype=np.int64)
+    np.maximum.at(first_sale, index, ages + 1)
+    active = np.clip(np.maximum(days_on_sale, first_sale), 0, lookback)
+
+    # Exponentially weighted mean: sum(w * units) / sum(w) over the active
+    # days, where sum(w) over days 0..active-1 is a geometric series
+    decay = 0.5 ** (1 / half_life)
+    weighted = np.bincount(index, weights=units * decay ** ages, minlength=count)
+    weight_total = (1 - decay ** active) / (1 - decay)
+    velocity = np.divide(weighted, weight_total, out=np.zeros(count), where=active > 0)
+
+    recent = ages < VARIABILITY_DAYS
+    window = np.minimum(active, VARIABILITY_DAYS)
+    total = np.bincount(index[recent], weights=units[recent], minlength=count)
+    squares = np.bincount(index[recent], weights=units[recent] ** 2, minlength=count)
+    mean = np.divide(total, window, out=np.zeros(count), where=window > 0)
+    variance = np.divide(squares, window, out=np.zeros(count), where=window > 0) - mean ** 2
+    demand_std = np.sqrt(np.maximum(variance, 0))
+
+    safety_stock = service_z * demand_std * np.sqrt(lead_time)
+    reorder_point = np.ceil(velocity * lead_time + safety_stock)
+    order_up_to = velocity * (lead_time + review_days) + safety_stock
+    has_demand = velocity >= MIN_VELOCITY
+    days_of_cover = np.divide(quantity, velocity, out=np.full(count, np.nan), where=has_demand)
+    needs_order = has_demand & (quantity <= reorder_point)
+    suggested = np.where(needs_order, np.maximum(np.ceil(order_up_to - quantity), 0), 0)
+
+    status = np.select(
+        [~has_demand, quantity <= 0, needs_order, days_of_cover > overstock_days],
+        [ReorderForecast.NO_DEMAND, ReorderForecast.OUT_OF_STOCK, ReorderForecast.REORDER, ReorderForecast.OVERSTOCK],
+        ReorderForecast.OK,
+    )
+    return {
+        'velocity': velocity,
+        'demand_std': demand_std,
+        'days_of_cover': days_of_cover,
+        'safety_stock': np.ceil(safety_stock).astype(np.int64),
+        'reorder_point': reorder_point.astype(np.int64),
+        'suggested_quantity': suggested.astype(np.int64),
+        'status': status,
+    }
+
+
+def compute_forecasts(today=None):
+    """(item ids, forecast columns) for every item from the sales up to yesterday"""
+    end = (today or timezone.localdate()) - timedelta(days=1)
+    lookback = settings.REORDER_LOOKBACK_DAYS
+    item_ids, quantity, days_on_sale = catalog(end)
+    fact_items, ages, units = demand_history(end - timedelta(days=lookback - 1), end)
+
+    # Facts of items deleted since the last refresh are gone with them
+    # (CASCADE), so every fact item is in the catalog
+    index = np.searchsorted(item_ids, fact_items)
+    columns = forecast_arrays(
+        quantity, days_on_sale, index, ages, units,
+        lookback=lookback,
+        half_life=settings.REORDER_HALF_LIFE_DAYS,
+        lead_time=settings.REORDER_LEAD_TIME_DAYS,
+        review_days=settings.REORDER_REVIEW_DAYS,
+        service_z=settings.REORDER_SERVICE_Z,
+        overstock_days=settings.REORDER_OVERSTOCK_DAYS,
+    )
+    return item_ids, columns
+
+
+def save_forecasts(item_ids, columns, now=None):
+    """Replace every ReorderForecast with the given columns; returns {status: item count}"""
+    now = now or timezone.now()
+    values = {name: column.tolist() for name, column in columns.items()}
+    values['days_of_cover'] = [None if cover != cover else cover for cover in values['days_of_cover']]
+    counts = {}
+    with transaction.atomic():
+        # Items deleted since the forecast was computed are left out
+        existing = set(Inventory.objects.values_list('id', flat=True))
+        forecasts = []
+        for position, item_id in enumerate(item_ids.tolist()):
+            if item_id not in existing:
+                continue
+            row = {name: column[position] for name, column in values.items()}
+            forecasts.append(ReorderForecast(item_id=item_id, computed_at=now, **row))
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        ReorderForecast.objects.all().delete()
+        ReorderForecast.objects.bulk_create(forecasts, batch_size=1000)
+        CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+    return counts
+
+
+def run_forecast(today=None):
+    item_ids, columns = compute_forecasts(today)
+    return save_forecasts(item_ids, columns)
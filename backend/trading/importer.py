@@ -0,0 +1,338 @@
+import csv
+import time
+from datetime import timedelta
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import metrics
+from .models import CacheVersion, ImportJob, Inventory, InventorySummary, StockMovement
+
+DEFAULT_IMPORT_BATCH_SIZE = 500
+DEFAULT_IMPORT_CHUNK_SIZE = 2000
+DEFAULT_JOB_STALE_SECONDS = 600
+
+# Errors a bad row can cause while its batch is written (ArithmeticError
+# covers decimal.InvalidOperation and OverflowError), and errors reading the
+# file, which fail the whole job
+ROW_ERRORS = (DataError, IntegrityError, ArithmeticError, ValueError, TypeError)
+FILE_ERRORS = (OSError, UnicodeDecodeError, csv.Error)
+
+# Largest integer any backend stores; SQLite reports no range of its own to
+# the field validators
+MAX_SQL_INTEGER = 2 ** 63 - 1
+
+UPDATE_FIELDS = ['description', 'quantity', 'srp_price', 'discount_price', 'last_updated']
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported_count = 0
+        self.updated_count = 0
+        self.errors = []
+
+    @property
+    def rows_processed(self):
+        return self.imported_count + self.updated_count + len(self.errors)
+
+    def merge(self, other):
+        self.imported_count += other.imported_count
+        self.updated_count += other.updated_count
+        self.errors.extend(other.errors)
+
+
+def parse_row(row):
+    """Normalize one FOCUS/Model/Description/Quantity/SRP/Discount CSV row"""
+    focus, model, description, quantity, srp_price, discount_price = row[:6]
+
+    focus = focus.strip() if focus else 'Unknown'
+    model = model.strip() if model else 'Unknown'
+    description = description.strip() if description else ''
+    quantity = int(quantity) if quantity.isdigit() else 0
+    srp_price = float(srp_price) if srp_price.replace('.', '').replace(',', '').isdigit() else 0.0
+    discount_price = float(discount_price) if discount_price.replace('.', '').replace(',', '').isdigit() else 0.0
+
+    values = {
+        'brand': focus,
+        'model': model,
+        'description': description,
+        'quantity': quantity,
+        'srp_price': srp_price,
+        'discount_price': discount_price,
+    }
+    check_storable(values)
+    return values
+
+
+def check_storable(values):
+    """Raise ValueError for a value its Inventory column can't hold.
+
+    A bulk write fails as a whole, so a value the database would reject has
+    to fail its own row here instead. Like the old row-by-row save, this
+    checks what the column can store (length, digits, integer range), not
+    the form validators such as the minimum price.
+    """
+    for name, value in values.items():
+        field = Inventory._meta.get_field(name)
+        if field.max_length and len(value) > field.max_length:
+            raise ValueError(f"{field.verbose_name} is longer than {field.max_length} characters")
+        if field.get_internal_type() == 'DecimalField':
+            limit = 10 ** (field.max_digits - field.decimal_places)
+            if abs(round(value, field.decimal_places)) >= limit:
+                raise ValueError(f"{field.verbose_name} {value} must be less than {limit}")
+        elif field.get_internal_type() == 'PositiveIntegerField':
+            if value > MAX_SQL_INTEGER:
+                raise ValueError(f"{field.verbose_name} {value} must be at most {MAX_SQL_INTEGER}")
+            try:
+                field.run_validators(value)
+            except ValidationError as e:
+                raise ValueError(f"{field.verbose_name}: {' '.join(e.messages)}")
+
+
+class InventoryImporter:
+    """Set-based upsert of inventory CSV rows matched on case-insensitive (brand, model).
+
+    Existing items are loaded into a (brand, model) -> item map with one query,
+    rows are validated in memory and the changes are written with batched
+    bulk_create/bulk_update. The per-row counts and error messages match the
+    old row-by-row import. Stock changes are appended to the StockMovement
+    ledger under `reference` and `user_id`.
+    """
+
+    def __init__(self, batch_size=None, reference='CSV import', user_id=None):
+        self.batch_size = batch_size or getattr(settings, 'INVENTORY_IMPORT_BATCH_SIZE', DEFAULT_IMPORT_BATCH_SIZE)
+        self.reference = reference
+        self.user_id = user_id
+        self.existing = None
+
+    @staticmethod
+    def key(brand, model):
+        return (brand.lower(), model.lower())
+
+    def load_existing(self):
+        # Inventory is ordered by item_name, so setdefault keeps the same
+        # match that .filter(...).first() used to return for duplicates.
+        self.existing = {}
+        rows = Inventory.objects.values_list('id', 'brand', 'model', 'quantity', 'unit_cost').iterator(chunk_size=5000)
+        for item_id, brand, model, quantity, unit_cost in rows:
+            self.existing.setdefault(self.key(brand, model), [item_id, quantity, unit_cost])
+
+    def import_rows(self, rows, start_row=2):
+        """Import an iterable of CSV rows in a single transaction"""
+        started = time.perf_counter()
+        if self.existing is None:
+            self.load_existing()
+
+        result = ImportResult()
+        to_create = {}
+        to_update = {}
+
+        for row_num, row in enumerate(rows, start=start_row):
+            try:
+                if len(row) < 6:
+                    result.errors.append(f"Row {row_num}: Insufficient columns")
+                    continue
+                values = parse_row(row)
+            except Exception as e:
+                result.errors.append(f"Row {row_num}: {str(e)}")
+                continue
+
+            key = self.key(values['brand'], values['model'])
+            if key in to_create:
+                # Created earlier in this batch: the old import would have
+                # found it and updated it
+                pending = to_create[key]
+                for field in ('description', 'quantity', 'srp_price', 'discount_price'):
+                    setattr(pending, field, values[field])
+                result.updated_count += 1
+            elif key in self.existing:
+                item = to_update.setdefault(key, Inventory(pk=self.existing[key][0]))
+                for field in ('description', 'quantity', 'srp_price', 'discount_price'):
+                    setattr(item, field, values[field])
+                result.updated_count += 1
+            else:
+                item_name = f"{values['brand']} {values['model']}"
+                max_length = Inventory._meta.get_field('item_name').max_length
+                if len(item_name) > max_length:
+                    result.errors.append(f"Row {row_num}: Item Name is longer than {max_length} characters")
+                    continue
+                to_create[key] = Inventory(
+                    item_name=item_name,
+                    **values
+                )
+                result.imported_count += 1
+
+        self.apply(to_create, to_update)
+        metrics.record_import(result, time.perf_counter() - started)
+        return result
+
+    def apply(self, to_create, to_update):
+        now = timezone.now()
+        summary_changes = []
+        movements = []
+
+        with transaction.atomic():
+            if to_update:
+                for key, item in to_update.items():
+                    item.last_updated = now
+                    entry = self.existing[key]
+                    summary_changes.append(((entry[1], entry[2]), (item.quantity, entry[2])))
+                    movements.append(StockMovement.for_change(
+                        entry[0], (entry[1], entry[2]), (item.quantity, entry[2]),
+                        StockMovement.IMPORT, self.reference, self.user_id,
+                    ))
+                    entry[1] = item.quantity
+                Inventory.objects.bulk_update(to_update.values(), UPDATE_FIELDS, batch_size=self.batch_size)
+
+            if to_create:
+                created = Inventory.objects.bulk_create(to_create.values(), batch_size=self.batch_size)
+                for key, item in zip(to_create.keys(), created):
+                    self.existing[key] = [item.pk, item.quantity, item.unit_cost]
+                    summary_changes.append((None, (item.quantity, item.unit_cost)))
+                    movements.append(StockMovement.for_change(
+                        item.pk, None, (item.quantity, item.unit_cost), StockMovement.IMPORT, self.reference, self.user_id,
+                    ))
+                CacheVersion.bump(CacheVersion.INVENTORY_CATALOG)
+
+            InventorySummary.apply_changes(summary_changes)
+            StockMovement.objects.bulk_create([movement for movement in movements if movement], batch_size=self.batch_size)
+            if summary_changes:
+                CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+
+
+def iter_csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as handle:
+        reader = csv.reader(handle)
+        next(reader, None)
+        yield from reader
+
+
+def requeue_stale_jobs(now=None):
+    """Put running jobs whose worker stopped reporting progress back in the queue; returns how many"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'IMPORT_JOB_STALE_SECONDS', DEFAULT_JOB_STALE_SECONDS))
+    return ImportJob.objects.filter(status=ImportJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    ).update(status=ImportJob.STATUS_PENDING)
+
+
+def claim_job(job_id):
+    """Atomically move a pending job to running; None when another worker got it first"""
+    now = timezone.now()
+    claimed = ImportJob.objects.filter(id=job_id, status=ImportJob.STATUS_PENDING).update(
+        status=ImportJob.STATUS_RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+    )
+    return ImportJob.objects.get(id=job_id) if claimed else None
+
+
+def claim_next_job():
+    """Atomically move the oldest pending job to running; None when the queue is empty"""
+    requeue_stale_jobs()
+    for job_id in ImportJob.objects.filter(status=ImportJob.STATUS_PENDING).order_by('created_at').values_list('id', flat=True)[:10]:
+        job = claim_job(job_id)
+        if job is not None:
+            return job
+    return None
+
+
+def import_chunk(importer, chunk, start_row):
+    """import_rows() on a chunk, retried row by row if the batch fails so only the offending rows become errors"""
+    try:
+        return importer.import_rows(chunk, start_row=start_row)
+    except ROW_ERRORS:
+        # The failed transaction may have left the (brand, model) map ahead of the database
+        importer.load_existing()
+
+    result = ImportResult()
+    for row_num, row in enumerate(chunk, start=start_row):
+        try:
+            result.merge(importer.import_rows([row], start_row=row_num))
+        except ROW_ERRORS as e:
+            importer.load_existing()
+            result.errors.append(f"Row {row_num}: {str(e)}")
+    return result
+
+
+def import_job_rows(job, claim, chunk_size):
+    """Import the job's CSV chunk by chunk; False if the job was requeued and taken over by another worker"""
+    importer = InventoryImporter(reference=f'Import job #{job.id}', user_id=job.user_id)
+    totals = ImportResult()
+    path = job.csv_file.path
+    total_rows = sum(1 for _ in iter_csv_rows(path))
+    if not claim.update(total_rows=total_rows, heartbeat_at=timezone.now()):
+        return False
+
+    rows = iter_csv_rows(path)
+    row_num = 2
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return True
+        result = import_chunk(importer, chunk, row_num)
+        row_num += len(chunk)
+        totals.merge(result)
+        progressed = claim.update(
+            rows_done=row_num - 2,
+            imported_count=totals.imported_count,
+            updated_count=totals.updated_count,
+            error_count=len(totals.errors),
+            errors=totals.errors[:ImportJob.MAX_STORED_ERRORS],
+            heartbeat_at=timezone.now(),
+        )
+        if not progressed:
+            return False
+
+
+def run_import_job(job, chunk_size=None):
+    """Import a job's CSV in chunks, committing and recording progress after each one.
+
+    Each chunk is its own short transaction so cashier writes are never
+    queued behind a whole file. Bad rows are reported as row errors; the job
+    only fails when the file itself can't be read. Other errors (e.g. a lost
+    database connection) propagate and leave the job running, so it is
+    requeued once its heartbeat goes stale. Rows are upserts, so re-running
+    the chunks committed before the interruption changes nothing.
+    """
+    chunk_size = chunk_size or getattr(settings, 'INVENTORY_IMPORT_CHUNK_SIZE', DEFAULT_IMPORT_CHUNK_SIZE)
+    # Progress is only written while this worker's claim stands
+    claim = ImportJob.objects.filter(id=job.id, status=ImportJob.STATUS_RUNNING, started_at=job.started_at)
+    try:
+        finished = import_job_rows(job, claim, chunk_size)
+    except FILE_ERRORS as e:
+        claim.update(
+            status=ImportJob.STATUS_FAILED,
+            failure_reason=f'Could not read the CSV file: {e}',
+            finished_at=timezone.now(),
+        )
+    else:
+        if finished:
+            claim.update(
+                status=ImportJob.STATUS_COMPLETED,
+                finished_at=timezone.now(),
+            )
+    job.refresh_from_db()
+    return job
+
+
+def run_import_job_inline(job):
+    """Import a just-queued job in this process (INVENTORY_IMPORT_INLINE), for
+    setups that run no process_import_jobs worker"""
+    claimed = claim_job(job.id)
+    if claimed is None:
+        job.refresh_from_db()
+        return job
+    try:
+        return run_import_job(claimed)
+    except Exception as e:
+        # Without a worker a stale job would never be picked up again
+        ImportJob.objects.filter(id=claimed.id, status=ImportJob.STATUS_RUNNING).update(
+            status=ImportJob.STATUS_FAILED,
+            failure_reason=f'Import interrupted: {e}',
+            finished_at=timezone.now(),
+        )
+        claimed.refresh_from_db()
+        return claimed
@@ -0,0 +1,146 @@
+"""Point-in-time stock from the StockMovement ledger and its checkpoints.
+
+take_checkpoints() writes, for every item that moved since the previous
+run, its absolute stock and unit cost as of the run. Because a run covers
+every item that moved since the one before, no item has movements between
+its latest checkpoint and the latest run at or before any moment T; stock at
+T is therefore each item's latest checkpoint plus the movements made after
+that run up to T. Run it nightly and the tail is at most a day long.
+
+Checkpoints only cover movements at least SETTLE_SECONDS old, so one
+recorded by a transaction that was still open during a run is not skipped.
+Movements written later with back-dated timestamps (synthetic data) are
+not, so rebuild_checkpoints() after writing those.
+Deleting an item deletes its ledger, so deleted items drop out of past
+valuations too.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+from .models import Inventory, StockCheckpoint, StockMovement
+
+SETTLE_SECONDS = 60
+ID_CHUNK_SIZE = 5000
+
+
+def chunked(values, size=ID_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def movement_totals(movements):
+    """{item_id: (quantity change, unit cost after the item's last movement)} for a StockMovement queryset"""
+    rows = movements.order_by().values('item_id').annotate(change=Sum('quantity_change'), last_id=Max('id'))
+    totals = {row['item_id']: (row['change'], row['last_id']) for row in rows}
+    costs = {}
+    for ids in chunked(last_id for _, last_id in totals.values()):
+        costs.update(StockMovement.objects.filter(id__in=ids).values_list('id', 'unit_cost'))
+    return {item_id: (change, costs[last_id]) for item_id, (change, last_id) in totals.items()}
+
+
+def checkpoint_balances(as_of, item_ids=None):
+    """{item_id: (quantity, unit_cost)} from each item's latest checkpoint at or before as_of"""
+    latest = StockCheckpoint.objects.filter(item=OuterRef('pk'), as_of__lte=as_of).order_by('-as_of')
+    items = Inventory.objects.order_by().annotate(
+        checkpoint_quantity=Subquery(latest.values('quantity')[:1]),
+        checkpoint_cost=Subquery(latest.values('unit_cost')[:1]),
+    ).filter(checkpoint_quantity__isnull=False)
+
+    balances = {}
+    for ids in ([None] if item_ids is None else chunked(item_ids)):
+        rows = items if ids is None else items.filter(id__in=ids)
+        for item_id, quantity, unit_cost in rows.values_list('id', 'checkpoint_quantity', 'checkpoint_cost'):
+            balances[item_id] = (quantity, unit_cost)
+    return balances
+
+
+def latest_checkpoint_run(when=None):
+    checkpoints = StockCheckpoint.objects.all()
+    if when is not None:
+        checkpoints = checkpoints.filter(as_of__lte=when)
+    return checkpoints.aggregate(latest=Max('as_of'))['latest']
+
+
+def stock_at(when=None, item_ids=None):
+    """{item_id: (quantity, unit_cost)} at `when` (default: every recorded movement), for items that had stock recorded"""
+    checkpoint_run = latest_checkpoint_run(when)
+    balances = checkpoint_balances(checkpoint_run, item_ids) if checkpoint_run else {}
+
+    tail = StockMovement.objects.all()
+    if checkpoint_run:
+        tail = tail.filter(created_at__gt=checkpoint_run)
+    if when is not None:
+        tail = tail.filter(created_at__lte=when)
+    if item_ids is not None:
+        tail = tail.filter(item_id__in=item_ids)
+    for item_id, (change, unit_cost) in movement_totals(tail).items():
+        quantity = balances.get(item_id, (0, unit_cost))[0]
+        balances[item_id] = (quantity + change, unit_cost)
+    return balances
+
+
+def take_checkpoints(now=None):
+    """Checkpoint every item that moved since the last run; returns the number of checkpoints written"""
+    now = now or timezone.now()
+    as_of = now - timedelta(seconds=SETTLE_SECONDS)
+
+    with transaction.atomic():
+        previous = latest_checkpoint_run()
+        if previous is not None and previous >= as_of:
+            return 0
+        window = StockMovement.objects.filter(created_at__lte=as_of)
+        if previous is not None:
+            window = window.filter(created_at__gt=previous)
+        moved = movement_totals(window)
+        if not moved:
+            return 0
+
+        balances = checkpoint_balances(previous, moved) if previous else {}
+        checkpoints = [
+            StockCheckpoint(
+                item_id=item_id,
+                as_of=as_of,
+                quantity=balances.get(item_id, (0, None))[0] + change,
+                unit_cost=unit_cost,
+            )
+            for item_id, (change, unit_cost) in moved.items()
+        ]
+        StockCheckpoint.objects.bulk_create(checkpoints, batch_size=1000)
+    return len(checkpoints)
+
+
+def rebuild_checkpoints(now=None):
+    """Replace every checkpoint with a single run over the whole ledger"""
+    with transaction.atomic():
+        StockCheckpoint.objects.all().delete()
+        return take_checkpoints(now)
+
+
+def ledger_drift():
+    """[(item, ledger quantity)] for items whose stock differs from what the ledger adds up to"""
+    with transaction.atomic():
+        ledger = stock_at()
+        drift = []
+        for item in Inventory.objects.order_by('id').only('id', 'item_name', 'quantity', 'unit_cost').iterator(chunk_size=5000):
+            quantity = ledger.get(item.id, (0, None))[0]
+            if quantity != item.quantity:
+                drift.append((item, quantity))
+    return drift
+
+
+def record_corrections(drift, user_id=None):
+    """Append correction movements that bring the ledger back in line with Inventory.quantity"""
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            item_id=item.id,
+            reason=StockMovement.CORRECTION,
+            quantity_change=item.quantity - quantity,
+            unit_cost=item.unit_cost,
+            reference='verify_stock_ledger --repair',
+            user_id=user_id,
+        )
+        for item, quantity in drift
+    ], batch_size=1000)
+    return len(drift)
@@ -0,0 +1,263 @@
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client, override_settings
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from backend.trading.benchmarks import QueryTimer, percentile
+from backend.trading.models import (
+    BuyItem, CacheVersion, DailyPurchaseRollup, DailySalesRollup, ImportJob, Inventory, InventorySummary, Sale,
+    TimeLog,
+)
+
+BRANDS = ['Asus', 'MSI', 'Gigabyte', 'Logitech', 'Kingston', 'Samsung', 'Seagate', 'Corsair', 'AMD', 'Intel']
+CATEGORIES = ['Laptop', 'Monitor', 'SSD', 'RAM', 'Keyboard', 'Mouse', 'GPU', 'Motherboard', 'PSU', 'Headset']
+
+# How to call each named URL; anything not listed is a plain GET. None skips it.
+REQUEST_SPECS = {
+    'logout': None,  # would end the benchmark session
+    'cashier_typeahead': {'query': {'q': 'as'}},
+    'update_item_ajax': {'method': 'post', 'json': {'quantity': 10 ** 6}},
+    'batch_update_items': {'method': 'post', 'json': 'batch'},
+    'checkout_cart': {'method': 'post', 'json': 'cart'},
+}
+
+
+# Benchmark pages must never land in the shared cache: their keys (cache
+# versions, watermarks) are values the live site reaches again later
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+}
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Times every URL in js_it_comp_trad/urls.py through the test client and writes the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000, help='Inventory rows to seed')
+        parser.add_argument('--sales', type=int, default=5000, help='Sales (and half as many purchases) to seed')
+        parser.add_argument('--no-seed', action='store_true',
+                            help='Benchmark the existing data in --database instead of seeding')
+        parser.add_argument('--database',
+                            help='Database alias to benchmark against (e.g. a copy of production); '
+                                 'by default a throwaway test database is created')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per URL first')
+        parser.add_argument('--only', action='append', help='URL name to benchmark (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def seed(self, items, sales, rng):
+        user = User.objects.create(username='benchmark-runner', is_staff=True, is_superuser=True)
+        Inventory.objects.bulk_create(
+            (
+                Inventory(
+                    item_name=f'{rng.choice(BRANDS)} {rng.choice(CATEGORIES)} {i:05d}',
+                    brand=rng.choice(BRANDS),
+                    model=f'BM-{i:06d}',
+                    description=f'Benchmark {rng.choice(CATEGORIES).lower()} item',
+                    quantity=rng.choice([0, 2, 5, 10, 25, 100]),
+                    unit_cost=Decimal(rng.randint(100, 40000)),
+                    srp_price=Decimal(rng.randint(150, 50000)),
+                )
+                for i in range(items)
+            ),
+            batch_size=1000,
+        )
+        item_ids = list(Inventory.objects.values_list('id', flat=True))
+        Sale.objects.bulk_create(
+            (
+                Sale(cashier=user, item_id=rng.choice(item_ids), quantity_sold=1,
+                     unit_price=Decimal('500.00'), total_amount=Decimal('500.00'))
+                for _ in range(sales)
+            ),
+            batch_size=1000,
+        )
+        BuyItem.objects.bulk_create(
+            (
+                BuyItem(buyer=user, item_id=rng.choice(item_ids), quantity_bought=1,
+                        unit_cost=Decimal('300.00'), total_cost=Decimal('300.00'))
+                for _ in range(sales // 2)
+            ),
+            batch_size=1000,
+        )
+        TimeLog.objects.bulk_create(
+            (TimeLog(user=user, time_out=timezone.now(), is_active=False) for _ in range(sales // 10)),
+            batch_size=1000,
+        )
+        DailySalesRollup.rebuild()
+        DailyPurchaseRollup.rebuild()
+        InventorySummary.rebuild()
+        CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+        CacheVersion.bump(CacheVersion.INVENTORY_CATALOG)
+        return user
+
+    def targets(self, only, item_id, job_id):
+        """(name, method, path, query, body) for every named URL pattern"""
+        kwargs_by_converter = {'item_id': item_id, 'job_id': job_id}
+        targets = []
+        for pattern in get_resolver().url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if only and pattern.name not in only:
+                continue
+            spec = REQUEST_SPECS.get(pattern.name, {})
+            if spec is None:
+                continue
+            kwargs = {key: kwargs_by_converter[key] for key in pattern.pattern.converters}
+            body = spec.get('json')
+            if body == 'batch':
+                body = {'items': [{'id': item_id, 'quantity': 10 ** 6, 'srp_price': '999.00'}]}
+            elif body == 'cart':
+                body = {'lines': [{'item_id': item_id, 'quantity': 1}]}
+            targets.append((pattern.name, spec.get('method', 'get'), reverse(pattern.name, kwargs=kwargs),
+                            spec.get('query', {}), body))
+        return targets
+
+    def request(self, client, method, path, query, body):
+        if method == 'post':
+            response = client.post(path, json.dumps(body), content_type='application/json')
+        else:
+            response = client.get(path, query)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def measure(self, client, target, iterations, warmup):
+        name, method, path, query, body = target
+        for _ in range(warmup):
+            self.request(client, method, path, query, body)
+
+        timings, query_counts, query_times, statuses = [], [], [], set()
+        for _ in range(iterations):
+            queries = QueryTimer()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                statuses.add(self.request(client, method, path, query, body))
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(queries.count)
+            query_times.append(queries.elapsed * 1000)
+
+        # Separate pass: tracemalloc slows everything down too much to time under it
+        tracemalloc.start()
+        self.request(client, method, path, query, body)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'name': name,
+            'method': method.upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'latency_ms': {
+                'min': min(timings),
+                'p50': statistics.median(timings),
+                'p90': percentile(timings, 0.90),
+                'p99': percentile(timings, 0.99),
+                'max': max(timings),
+                'mean': statistics.mean(timings),
+            },
+            'queries': {
+                'count_mean': statistics.mean(query_counts),
+                'count_max': max(query_counts),
+                'time_ms_mean': statistics.mean(query_times),
+            },
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if options['no_seed'] and not alias:
+            raise CommandError('--no-seed needs --database, the alias of a copy of the data to benchmark')
+        if alias and alias not in connections:
+            raise CommandError(f'Unknown database alias {alias!r}')
+
+        with override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            # The views use the default connection, so point it at the
+            # benchmark database rather than the live one
+            live_settings = connection.settings_dict
+            live_name = live_settings['NAME']
+            if alias:
+                connection.close()
+                connection.settings_dict = connections[alias].settings_dict
+            else:
+                self.stderr.write('Creating the test database...')
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                report = self.run(options)
+            finally:
+                if alias:
+                    connection.close()
+                    connection.settings_dict = live_settings
+                else:
+                    connection.creation.destroy_test_db(live_name, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote {len(report['views'])} results to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        report = None
+        # Everything, including the seeded rows and what the views write,
+        # is rolled back at the end, so a --database copy can be reused
+        try:
+            with transaction.atomic():
+                if options['no_seed']:
+                    user = User.objects.filter(is_superuser=True).order_by('id').first()
+                    if user is None:
+                        raise CommandError('--no-seed needs a superuser in the benchmarked database')
+                else:
+                    user = self.seed(options['items'], options['sales'], rng)
+
+                item_id = Inventory.objects.order_by('id').values_list('id', flat=True).first()
+                if item_id is None:
+                    raise CommandError('There is no inventory to benchmark against')
+                Inventory.objects.filter(id=item_id).update(quantity=10 ** 6)
+                job_id = ImportJob.objects.create(user=user, original_name='benchmark.csv').id
+
+                client = Client()
+                client.force_login(user)
+                views = []
+                for target in self.targets(options['only'], item_id, job_id):
+                    views.append(self.measure(client, target, options['iterations'], options['warmup']))
+                    self.stderr.write(f"{target[0]:<28} p50 {views[-1]['latency_ms']['p50']:8.2f} ms")
+
+                report = {
+                    'meta': {
+                        'created': timezone.now().isoformat(),
+                        'python': platform.python_version(),
+                        'django': django.get_version(),
+                        'database': connection.vendor,
+                        'database_alias': options['database'],
+                        'seeded': not options['no_seed'],
+                        'inventory_rows': Inventory.objects.count(),
+                        'sale_rows': Sale.objects.count(),
+                        'iterations': options['iterations'],
+                        'warmup': options['warmup'],
+                    },
+                    'views': views,
+                }
+                raise RollbackBenchmark()
+        except RollbackBenchmark:
+            pass
+
+        return report
@@ -0,0 +1,96 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from backend.trading.importer import InventoryImporter
+from backend.trading.models import Inventory
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measures inventory CSV import throughput (rows/second) against a synthetic price list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Number of CSV rows to import')
+        parser.add_argument('--batch-size', type=int, default=None, help='bulk_create/bulk_update batch size')
+        parser.add_argument(
+            '--update-ratio',
+            type=float,
+            default=0.5,
+            help='Fraction of rows that match items already in inventory',
+        )
+        parser.add_argument(
+            '--legacy',
+            action='store_true',
+            help='Also time the old row-by-row filter().first() + save() import',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def build_rows(self, count, update_ratio, seed):
+        rng = random.Random(seed)
+        existing = list(Inventory.objects.values_list('brand', 'model')[:count])
+        rows = []
+        for i in range(count):
+            if existing and rng.random() < update_ratio:
+                brand, model = rng.choice(existing)
+            else:
+                brand, model = f'BenchBrand{i % 200}', f'BM-{i:07d}'
+            rows.append([
+                brand,
+                model,
+                f'Benchmark item {i}',
+                str(rng.randint(0, 50)),
+                f'{rng.uniform(100, 50000):.2f}',
+                f'{rng.uniform(50, 40000):.2f}',
+            ])
+        return rows
+
+    def legacy_import(self, rows):
+        for row in rows:
+            focus, model, description, quantity, srp_price, discount_price = row[:6]
+            existing_item = Inventory.objects.filter(brand__iexact=focus, model__iexact=model).first()
+            if existing_item:
+                existing_item.description = description
+                existing_item.quantity = int(quantity)
+                existing_item.srp_price = float(srp_price)
+                existing_item.discount_price = float(discount_price)
+                existing_item.save()
+            else:
+                Inventory.objects.create(
+                    item_name=f"{focus} {model}",
+                    brand=focus,
+                    model=model,
+                    description=description,
+                    quantity=int(quantity),
+                    srp_price=float(srp_price),
+                    discount_price=float(discount_price)
+                )
+
+    def timed(self, label, func, row_count):
+        # Every run is rolled back so the benchmark leaves the database untouched
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                func()
+                elapsed = time.perf_counter() - started
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+        rate = row_count / elapsed if elapsed else float('inf')
+        self.stdout.write(f'{label:<10} {row_count} rows in {elapsed:.2f}s = {rate:,.0f} rows/second')
+        return elapsed
+
+    def handle(self, *args, **options):
+        rows = self.build_rows(options['rows'], options['update_ratio'], options['seed'])
+        importer = InventoryImporter(batch_size=options['batch_size'])
+        self.stdout.write(f'Batch size: {importer.batch_size}')
+
+        bulk_elapsed = self.timed('bulk', lambda: importer.import_rows(rows), len(rows))
+
+        if options['legacy']:
+            legacy_elapsed = self.timed('legacy', lambda: self.legacy_import(rows), len(rows))
+            if bulk_elapsed:
+                self.stdout.write(self.style.SUCCESS(f'Speed-up: {legacy_elapsed / bulk_elapsed:.1f}x'))
@@ -0,0 +1,42 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from backend.trading.models import Inventory
+from backend.trading.search import LikeSearchBackend, get_search_backend
+
+DEFAULT_QUERIES = ['asus', 'rog', 'gaming laptop', 'ram', 'ssd 1tb', 'logi', 'monitor 24', 'cable']
+
+
+class Command(BaseCommand):
+    help = 'Compares full-text search latency with the old icontains Q chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', help='Search terms (defaults to a fixed sample)')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query and backend')
+        parser.add_argument('--page-size', type=int, default=12, help='Rows fetched per search, like a dashboard page')
+
+    def time_backend(self, backend, query, repeat, page_size):
+        timings = []
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = backend.search(Inventory.objects.all(), query)
+            ordering = ('search_rank', 'item_name') if backend.ranked else ('item_name',)
+            count = results.count()
+            list(results.order_by(*ordering)[:page_size])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), max(timings), count
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        backends = [LikeSearchBackend(), get_search_backend()]
+        if backends[1].name == backends[0].name:
+            self.stdout.write(self.style.WARNING('No full-text index available; only the LIKE backend will be timed'))
+            backends = backends[:1]
+
+        self.stdout.write(f'{Inventory.objects.count()} inventory rows, {options["repeat"]} runs per query')
+        self.stdout.write(f'{"query":<16} {"backend":<12} {"matches":>8} {"median ms":>10} {"max ms":>10}')
+        for query in queries:
+            for backend in backends:
+                median, worst, count = self.time_backend(backend, query, options['repeat'], options['page_size'])
+                self.stdout.write(f'{query:<16} {backend.name:<12} {count:>8} {median:>10.2f} {worst:>10.2f}')
@@ -0,0 +1,97 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from backend.trading.benchmarks import percentile
+
+DEFAULT_PATHS = [
+    '/dashboard/',
+    '/dashboard/?search=asus',
+    '/cashier/',
+    '/cashier/typeahead/?q=as',
+    '/cashier/sales/',
+    '/time/logs/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compares latency percentiles of running WSGI and ASGI servers under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NAME=URL',
+                            help='Server to load, e.g. wsgi=http://127.0.0.1:8000 (repeatable)')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per path and target')
+        parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight at once')
+        parser.add_argument('--username', help='User to log in as (defaults to the first superuser)')
+
+    def session_cookie(self, username):
+        """A logged-in session the servers will accept, created straight in the session store"""
+        users = User.objects.filter(username=username) if username else User.objects.filter(is_superuser=True)
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError('No user to log in as; pass --username')
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session['last_activity'] = timezone.now().isoformat()
+        session.save()
+        return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+    def fetch(self, url, cookie):
+        request = urllib.request.Request(url, headers={'Cookie': cookie})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = 0
+        return (time.perf_counter() - started) * 1000, status
+
+    def run(self, base_url, path, cookie, total, concurrency):
+        url = base_url.rstrip('/') + path
+        self.fetch(url, cookie)  # warm-up: caches, lazy imports, connections
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(lambda _: self.fetch(url, cookie), range(total)))
+            elapsed = time.perf_counter() - started
+        timings = [ms for ms, _ in results]
+        errors = sum(1 for _, status in results if status != 200)
+        return {
+            'p50': statistics.median(timings),
+            'p95': percentile(timings, 0.95),
+            'p99': percentile(timings, 0.99),
+            'rps': total / elapsed,
+            'errors': errors,
+        }
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url.startswith('http'):
+                raise CommandError(f'--target must look like name=http://host:port, got {target!r}')
+            targets.append((name, url))
+
+        cookie = self.session_cookie(options['username'])
+        paths = options['paths'] or DEFAULT_PATHS
+        self.stdout.write(f'{options["requests"]} requests per path, {options["concurrency"]} concurrent')
+        self.stdout.write(f'{"path":<28} {"target":<8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>8} {"errors":>7}')
+        for path in paths:
+            for name, url in targets:
+                result = self.run(url, path, cookie, options['requests'], options['concurrency'])
+                self.stdout.write(
+                    f'{path:<28} {name:<8} {result["p50"]:>8.1f} {result["p95"]:>8.1f} {result["p99"]:>8.1f} '
+                    f'{result["rps"]:>8.1f} {result["errors"]:>7}'
+                )
@@ -0,0 +1,138 @@
+import re
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from backend.trading.models import (
+    BuyItem, DailySalesRollup, Inventory, Sale, TimeLog, day_range_lookup, local_day_start,
+)
+
+PAGE_SIZE = 21
+
+
+class RollbackSeed(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot history, dashboard and time-clock queries and fails on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Insert this many synthetic rows per table first (rolled back afterwards)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def cases(self, day, position, user_id):
+        """(label, table, queryset, ordered) for every query the indexes are meant to serve"""
+        sale_after = Q(sale_date__lt=position) | Q(sale_date=position, id__lt=1000)
+        purchase_after = Q(purchase_date__lt=position) | Q(purchase_date=position, id__lt=1000)
+        log_after = Q(time_in__lt=position) | Q(time_in=position, id__lt=1000)
+        cases = [
+            ('sales history, one day', 'trading_sale',
+             Sale.objects.filter(**day_range_lookup('sale_date', day, day)).order_by('-sale_date', '-id')[:PAGE_SIZE], True),
+            ('sales history, next page', 'trading_sale',
+             Sale.objects.filter(sale_after).order_by('-sale_date', '-id')[:PAGE_SIZE], True),
+            ('sales export, date range', 'trading_sale',
+             Sale.objects.filter(**day_range_lookup('sale_date', day - timedelta(days=30), day)), False),
+            ('purchase history, one day', 'trading_buyitem',
+             BuyItem.objects.filter(**day_range_lookup('purchase_date', day, day)).order_by('-purchase_date', '-id')[:PAGE_SIZE], True),
+            ('purchase history, next page', 'trading_buyitem',
+             BuyItem.objects.filter(purchase_after).order_by('-purchase_date', '-id')[:PAGE_SIZE], True),
+            ('time logs, one day', 'trading_timelog',
+             TimeLog.objects.filter(**day_range_lookup('time_in', day, day)).order_by('-time_in', '-id')[:PAGE_SIZE], True),
+            ('time logs, next page', 'trading_timelog',
+             TimeLog.objects.filter(log_after).order_by('-time_in', '-id')[:PAGE_SIZE], True),
+            ('active time log for user', 'trading_timelog',
+             TimeLog.objects.filter(user_id=user_id, is_active=True), False),
+            ('daily sales rollup totals', 'trading_dailysalesrollup',
+             DailySalesRollup.objects.filter(day=day).values('transaction_count', 'amount'), False),
+            ('dashboard first page', 'trading_inventory',
+             Inventory.objects.order_by('item_name')[:12], True),
+            ('rollup rebuild since', 'trading_sale',
+             Sale.objects.filter(sale_date__gte=local_day_start(day)).values('id'), False),
+        ]
+        if connection.vendor == 'postgresql':
+            # SQLite compiles iexact to LIKE, which no expression index can serve
+            cases.append(('brand/model lookup', 'trading_inventory',
+                          Inventory.objects.filter(brand__iexact='Asus', model__iexact='ROG-1'), False))
+        return cases
+
+    def problems(self, plan, table, ordered):
+        found = []
+        if connection.vendor == 'sqlite':
+            if re.search(rf'\bSCAN {table}\b(?! USING)', plan):
+                found.append(f'full scan of {table}')
+            if ordered and 'USE TEMP B-TREE FOR ORDER BY' in plan:
+                found.append('sort not served by an index')
+        elif connection.vendor == 'postgresql':
+            if re.search(rf'Seq Scan on {table}\b', plan):
+                found.append(f'sequential scan of {table}')
+            if ordered and re.search(r'^\s*(->\s*)?(Incremental )?Sort\b', plan, re.MULTILINE):
+                found.append('sort not served by an index')
+        return found
+
+    def seed(self, rows):
+        # purchase_date, sale_date and time_in are auto_now_add, so every
+        # seeded row lands on today; the plans only depend on the row count.
+        user = User.objects.create(username='query-plan-check')
+        item = Inventory.objects.create(item_name='Query plan item', brand='Check', model='QP', quantity=rows)
+        Inventory.objects.bulk_create(
+            (Inventory(item_name=f'Item {i:06d}', brand=f'Brand {i % 50}', model=f'M-{i}') for i in range(rows)),
+            batch_size=1000,
+        )
+        Sale.objects.bulk_create(
+            (Sale(cashier=user, item=item, quantity_sold=1, unit_price=Decimal('1.00'), total_amount=Decimal('1.00'))
+             for _ in range(rows)),
+            batch_size=1000,
+        )
+        BuyItem.objects.bulk_create(
+            (BuyItem(buyer=user, item=item, quantity_bought=1, unit_cost=Decimal('1.00'), total_cost=Decimal('1.00'))
+             for _ in range(rows)),
+            batch_size=1000,
+        )
+        TimeLog.objects.bulk_create((TimeLog(user=user, is_active=False) for _ in range(rows)), batch_size=1000)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        return user.id
+
+    def check_plans(self, user_id, verbose):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Query plan checks are not implemented for {connection.vendor}')
+        if connection.vendor == 'postgresql':
+            # On small tables a sequential scan is legitimately cheaper; this
+            # asks whether an index *could* serve the query at all.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        now = timezone.now()
+        failures = 0
+        for label, table, queryset, ordered in self.cases(timezone.localdate(now), now, user_id):
+            plan = queryset.explain()
+            found = self.problems(plan, table, ordered)
+            if found:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'FAIL {label}: {"; ".join(found)}'))
+            else:
+                self.stdout.write(f'ok   {label}')
+            if found or verbose:
+                for line in plan.splitlines():
+                    self.stdout.write(f'       {line}')
+        return failures
+
+    def handle(self, *args, **options):
+        failures = None
+        try:
+            with transaction.atomic():
+                user_id = self.seed(options['seed']) if options['seed'] else (User.objects.values_list('id', flat=True).first() or 0)
+                failures = self.check_plans(user_id, options['verbose_plans'])
+                raise RollbackSeed()
+        except RollbackSeed:
+            pass
+
+        if failures:
+            raise CommandError(f'{failures} query plan(s) fall back to full scans or sorts')
+        self.stdout.write(self.style.SUCCESS(f'All query plans use indexes ({connection.vendor})'))
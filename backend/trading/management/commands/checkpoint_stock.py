@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from backend.trading.ledger import rebuild_checkpoints, take_checkpoints
+
+class Command(BaseCommand):
+    help = 'Checkpoints the stock of every item that moved since the last run (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop every checkpoint and take one from the whole ledger (after back-dated movements)',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_checkpoints() if options['rebuild'] else take_checkpoints()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} stock checkpoints'))
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from backend.trading.analytics import refresh_sales_facts
+from backend.trading.forecast import run_forecast
+from backend.trading.models import ReorderForecast
+
+class Command(BaseCommand):
+    help = 'Forecasts demand and reorder quantities for every item from the sales history (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-refresh',
+            action='store_true',
+            help='Forecast from the sales facts as they are, without folding in new sales first',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['skip_refresh']:
+            refresh_sales_facts()
+        counts = run_forecast()
+        elapsed = time.perf_counter() - started
+
+        for status, label in ReorderForecast.STATUSES:
+            self.stdout.write(f'{label:<15} {counts.get(status, 0):>8}')
+        self.stdout.write(self.style.SUCCESS(f'Forecast {sum(counts.values())} items in {elapsed:.1f}s'))
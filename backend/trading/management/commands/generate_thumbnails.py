@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from backend.trading.models import Inventory
+from backend.trading.thumbnails import THUMBNAIL_ERRORS, generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Creates the thumbnail and WebP variants for existing inventory pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        items = Inventory.objects.exclude(item_picture='').exclude(item_picture__isnull=True).only('id', 'item_picture')
+        pictures = written = failed = 0
+        for item in items.iterator(chunk_size=500):
+            pictures += 1
+            try:
+                written += generate_thumbnails(item.item_picture, force=options['force'])
+            except THUMBNAIL_ERRORS as e:
+                failed += 1
+                self.stderr.write(f'{item.item_picture.name}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{pictures} pictures checked, {written} thumbnails written, {failed} failed'
+        ))
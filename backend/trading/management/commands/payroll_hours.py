@@ -0,0 +1,62 @@
+import csv
+import sys
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from backend.trading.payroll import EXPORT_HEADER, PERIODS, default_range, export_rows, payroll_hours, write_workbook
+
+class Command(BaseCommand):
+    help = 'Totals hours worked per employee by day, week or pay period (defaults to the current pay period)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help='First day (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end_date', help='Last day (YYYY-MM-DD)')
+        parser.add_argument('--period', choices=PERIODS, default='pay_period')
+        parser.add_argument('--user', action='append', dest='usernames', help='Only this username (repeatable)')
+        parser.add_argument('--format', choices=['table', 'csv', 'xlsx'], default='table')
+        parser.add_argument('--output', help='File to write (required for xlsx; csv defaults to stdout)')
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        default_start, default_end = default_range()
+        start_date = self.parse_date(options['start_date']) or default_start
+        end_date = self.parse_date(options['end_date']) or default_end
+        if end_date < start_date:
+            raise CommandError('--to is before --from')
+
+        rows = payroll_hours(start_date, end_date, options['period'], options['usernames'])
+
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('--format xlsx needs --output')
+            with open(options['output'], 'wb') as handle:
+                write_workbook(rows, handle)
+        elif options['format'] == 'csv':
+            handle = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+            try:
+                writer = csv.writer(handle)
+                writer.writerow(EXPORT_HEADER)
+                writer.writerows(export_rows(rows))
+            finally:
+                if options['output']:
+                    handle.close()
+        else:
+            self.stdout.write(f'{"Employee":<20} {"Period":<25} {"Hours":>9} {"Sessions":>9} {"Open":>5}')
+            for row in rows:
+                span = str(row['period_start']) if row['period_start'] == row['period_end'] else f"{row['period_start']} - {row['period_end']}"
+                self.stdout.write(
+                    f"{row['username']:<20} {span:<25} {row['hours']:>9} {row['sessions']:>9} {row['open_sessions']:>5}"
+                )
+
+        total = sum(row['hours'] for row in rows)
+        message = f'{len(rows)} rows, {total} hours from {start_date} to {end_date}'
+        if options['format'] == 'table' or options['output']:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stderr.write(self.style.SUCCESS(message))
@@ -1,12 +1,41 @@
 # Add your custom management commands here
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from backend.trading.models import Inventory
+from backend.trading.synthetic import SyntheticDataGenerator
 from decimal import Decimal
 
 class Command(BaseCommand):
-    help = 'Populates the database with sample inventory data'
+    help = 'Populates the database with sample inventory data, optionally plus a seeded synthetic dataset'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=0, help='Synthetic inventory items to generate')
+        parser.add_argument('--sales', type=int, default=0, help='Synthetic sales to generate')
+        parser.add_argument('--purchases', type=int, default=0, help='Synthetic purchases to generate')
+        parser.add_argument('--time-logs', type=int, default=0, help='Synthetic time log shifts to generate')
+        parser.add_argument('--users', type=int, default=10, help='Cashier/buyer accounts to spread rows across')
+        parser.add_argument('--days', type=int, default=365, help='Length of the date range, ending today')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
     
     def handle(self, *args, **options):
+        self.create_sample_items()
+        
+        counts = [options['items'], options['sales'], options['purchases'], options['time_logs']]
+        if any(counts):
+            generator = SyntheticDataGenerator(
+                seed=options['seed'],
+                days=options['days'],
+                users=options['users'],
+                batch_size=options['batch_size'],
+                log=self.stdout.write,
+            )
+            try:
+                generator.run(*counts)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS('Synthetic data generated; rollups, sales facts, stock checkpoints and summary rebuilt'))
+    
+    def create_sample_items(self):
         # Sample inventory items
         sample_items = [
             {
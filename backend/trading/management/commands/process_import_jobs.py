@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand
+from backend.trading.importer import claim_next_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = 'Processes queued inventory CSV import jobs in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows committed per progress update')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for import jobs...' if not options['once'] else 'Processing queued import jobs...')
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'Job {job.id}: importing {job.original_name}')
+                try:
+                    job = run_import_job(job, chunk_size=options['chunk_size'])
+                except Exception as e:
+                    # Left running; requeued once its heartbeat goes stale
+                    self.stdout.write(self.style.ERROR(f'Job {job.id} interrupted, will be retried: {e}'))
+                    time.sleep(options['poll_interval'])
+                    continue
+                if job.status == job.STATUS_RUNNING:
+                    self.stdout.write(f'Job {job.id}: taken over by another worker')
+                elif job.status == job.STATUS_COMPLETED:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Job {job.id}: {job.imported_count} imported, '
+                        f'{job.updated_count} updated, {job.error_count} errors'
+                    ))
+                else:
+                    self.stdout.write(self.style.ERROR(f'Job {job.id} failed: {job.failure_reason}'))
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
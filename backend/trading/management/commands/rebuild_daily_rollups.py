@@ -0,0 +1,36 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from backend.trading.models import DailySalesRollup, DailyPurchaseRollup
+
+class Command(BaseCommand):
+    help = 'Rebuilds (or backfills a date range of) the daily sales and purchase rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end_date', help='Last day to rebuild (YYYY-MM-DD)')
+        parser.add_argument(
+            '--only',
+            choices=['sales', 'purchases'],
+            help='Rebuild only one of the rollup tables',
+        )
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start_date'])
+        end_date = self.parse_date(options['end_date'])
+
+        targets = [('sales', DailySalesRollup), ('purchases', DailyPurchaseRollup)]
+        for name, rollup_model in targets:
+            if options['only'] and options['only'] != name:
+                continue
+            count = rollup_model.rebuild(start_date=start_date, end_date=end_date)
+            self.stdout.write(
+                self.style.SUCCESS(f'Rebuilt {count} daily {name} rollup rows')
+            )
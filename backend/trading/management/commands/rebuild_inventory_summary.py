@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from backend.trading.models import InventorySummary
+
+class Command(BaseCommand):
+    help = 'Rebuilds the dashboard inventory summary from the Inventory table'
+
+    def handle(self, *args, **options):
+        summary = InventorySummary.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Inventory summary rebuilt: {summary.total_items} items, '
+                f'total value {summary.total_value:,.2f}, '
+                f'{summary.low_stock_items} low stock, '
+                f'{summary.out_of_stock_items} out of stock'
+            )
+        )
@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from backend.trading.analytics import rebuild_sales_facts, refresh_sales_facts
+
+class Command(BaseCommand):
+    help = 'Folds sales made since the last refresh into the sales analytics facts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop every fact and rebuild from all sales (picks up edited or deleted sales)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running and refresh every this many seconds (for a worker process)',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = rebuild_sales_facts()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt sales facts from {count} sales'))
+        elif options['interval']:
+            self.stdout.write(f'Refreshing sales facts every {options["interval"]:g} seconds...')
+            try:
+                while True:
+                    count = refresh_sales_facts()
+                    if count:
+                        self.stdout.write(self.style.SUCCESS(f'Added {count} sales to the sales facts'))
+                    time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Stopped.')
+        else:
+            count = refresh_sales_facts()
+            self.stdout.write(self.style.SUCCESS(f'Added {count} sales to the sales facts'))
@@ -0,0 +1,44 @@
+import csv
+import sys
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from backend.trading.ledger import stock_at
+from backend.trading.models import Inventory
+
+class Command(BaseCommand):
+    help = 'Stock on hand and its value at a past moment, from the stock ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('at', help='YYYY-MM-DD (end of that day) or "YYYY-MM-DD HH:MM", local time')
+        parser.add_argument('--csv', action='store_true', help='Write every item with stock as CSV to stdout')
+
+    def parse_moment(self, value):
+        for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+            try:
+                moment = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if fmt == '%Y-%m-%d':
+                moment = datetime.combine(moment.date(), time.max)
+            return timezone.make_aware(moment)
+        raise CommandError(f'Invalid moment "{value}", expected YYYY-MM-DD or "YYYY-MM-DD HH:MM"')
+
+    def handle(self, *args, **options):
+        moment = self.parse_moment(options['at'])
+        balances = {item_id: stock for item_id, stock in stock_at(moment).items() if stock[0]}
+
+        if options['csv']:
+            names = dict(Inventory.objects.values_list('id', 'item_name'))
+            writer = csv.writer(sys.stdout)
+            writer.writerow(['Item ID', 'Item Name', 'Quantity', 'Unit Cost', 'Value'])
+            for item_id, (quantity, unit_cost) in sorted(balances.items()):
+                writer.writerow([item_id, names.get(item_id, ''), quantity, unit_cost, quantity * unit_cost])
+
+        units = sum(quantity for quantity, _ in balances.values())
+        value = sum(quantity * unit_cost for quantity, unit_cost in balances.values())
+        message = f'{timezone.localtime(moment):%Y-%m-%d %H:%M}: {len(balances)} items, {units} units, value {value:,.2f}'
+        if options['csv']:
+            self.stderr.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.trading.ledger import ledger_drift, record_corrections
+
+class Command(BaseCommand):
+    help = 'Compares every item\'s stock with what its stock movements add up to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Append correction movements so the ledger matches the current stock',
+        )
+        parser.add_argument('--limit', type=int, default=50, help='Drifted items to list (default 50)')
+
+    def handle(self, *args, **options):
+        drift = ledger_drift()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Stock ledger matches inventory'))
+            return
+
+        self.stdout.write(f'{"Item":>8} {"Name":<40} {"Ledger":>8} {"Stock":>8} {"Drift":>8}')
+        for item, quantity in drift[:options['limit']]:
+            self.stdout.write(
+                f'{item.id:>8} {item.item_name[:40]:<40} {quantity:>8} {item.quantity:>8} {item.quantity - quantity:>+8}'
+            )
+        if len(drift) > options['limit']:
+            self.stdout.write(f'... and {len(drift) - options["limit"]} more')
+
+        if options['repair']:
+            count = record_corrections(drift)
+            self.stdout.write(self.style.SUCCESS(f'Recorded {count} correction movements'))
+        else:
+            raise CommandError(f'{len(drift)} item(s) differ from the stock ledger; rerun with --repair to correct')
@@ -0,0 +1,83 @@
+"""Prometheus metrics and the /metrics endpoint.
+
+Under gunicorn every worker keeps its own counters. With
+PROMETHEUS_MULTIPROC_DIR set, prometheus_client stores each process's
+values in mmap'd files in that directory, and a scrape merges the files of
+all workers (and of the process_import_jobs worker, when it shares the
+directory). Recording a value is an in-memory update of the mapped file.
+"""
+import hmac
+import os
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'trading_http_request_duration_seconds', 'Request latency by view',
+    ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter('trading_http_requests', 'Responses by view and status code', ['view', 'method', 'status'])
+DB_QUERIES = Counter('trading_db_queries', 'SQL queries run while handling requests', ['view'])
+DB_QUERY_SECONDS = Counter('trading_db_query_seconds', 'Time spent in SQL queries while handling requests', ['view'])
+
+SALES = Counter('trading_sales', 'Sale lines recorded')
+SALES_AMOUNT = Counter('trading_sales_amount', 'Sales revenue recorded')
+PURCHASES = Counter('trading_purchases', 'Purchase lines recorded')
+PURCHASES_COST = Counter('trading_purchases_cost', 'Purchase cost recorded')
+
+IMPORT_ROWS = Counter('trading_import_rows', 'Inventory CSV rows processed', ['result'])
+IMPORT_SECONDS = Counter('trading_import_seconds', 'Time spent importing inventory CSV rows')
+
+SESSION_TIMEOUT_LOGOUTS = Counter('trading_session_timeout_logouts', 'Users logged out for inactivity')
+
+
+def view_label(request):
+    match = request.resolver_match
+    return match.view_name if match else '<unmatched>'
+
+
+def record_request(request, response, elapsed, stats):
+    view = view_label(request)
+    REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+    REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+    if stats.queries:
+        DB_QUERIES.labels(view).inc(stats.queries)
+        DB_QUERY_SECONDS.labels(view).inc(stats.db_time)
+
+
+def record_sales(count, amount):
+    SALES.inc(count)
+    SALES_AMOUNT.inc(float(amount))
+
+
+def record_purchases(count, cost):
+    PURCHASES.inc(count)
+    PURCHASES_COST.inc(float(cost))
+
+
+def record_import(result, elapsed):
+    IMPORT_ROWS.labels('imported').inc(result.imported_count)
+    IMPORT_ROWS.labels('updated').inc(result.updated_count)
+    IMPORT_ROWS.labels('error').inc(len(result.errors))
+    IMPORT_SECONDS.inc(elapsed)
+
+
+def scrape_allowed(request):
+    """Bearer METRICS_TOKEN for scrapers when one is configured, otherwise staff users"""
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        return hmac.compare_digest(supplied, settings.METRICS_TOKEN)
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics_view(request):
+    if not scrape_allowed(request):
+        return HttpResponseForbidden('Forbidden')
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
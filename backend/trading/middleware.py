@@ -1,29 +1,232 @@
+import cProfile
+import json
+import logging
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib import messages
+from django.core.exceptions import MiddlewareNotUsed
 from django.shortcuts import redirect
 from django.utils import timezone
 from datetime import timedelta
+from whitenoise.middleware import WhiteNoiseMiddleware
+from . import metrics, profiling
+from .activity import last_activity, touch_activity
+
+profiling_logger = logging.getLogger('backend.trading.profiling')
+
+class AsyncCapableMiddleware:
+    """Base for middleware that runs natively under both WSGI and ASGI.
+
+    Like Django's MiddlewareMixin: when the next handler is a coroutine,
+    __call__ returns the coroutine from __acall__, so async views are not
+    pushed onto a thread by a sync-only link in the chain.
+    """
+    sync_capable = True
+    async_capable = True
 
-class SessionTimeoutMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also runs natively under ASGI.
+
+    WhiteNoise 6.6 is sync-only; being above the session and auth
+    middleware, it would otherwise put every async view on a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opens the file
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class SessionTimeoutMiddleware(AsyncCapableMiddleware):
+    def check_timeout(self, request):
+        """Log an idle session out (returning the redirect) or record its activity"""
         if request.user.is_authenticated:
-            last_activity = request.session.get('last_activity')
+            now = timezone.now()
+            previous = last_activity(request.session)
             
-            if last_activity:
-                last_activity = timezone.datetime.fromisoformat(last_activity.replace('Z', '+00:00'))
-                
+            if previous:
                 timeout_period = timedelta(seconds=settings.SESSION_TIMEOUT)
                 
-                if timezone.now() - last_activity > timeout_period:
+                if now - previous > timeout_period:
                     logout(request)
+                    metrics.SESSION_TIMEOUT_LOGOUTS.inc()
                     messages.warning(request, 'You have been automatically logged out due to inactivity.')
                     return redirect('home')
             
-            request.session['last_activity'] = timezone.now().isoformat()
+            # Only marks the session modified (and so written) once per
+            # SESSION_ACTIVITY_GRANULARITY seconds
+            touch_activity(request.session, now)
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.check_timeout(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        # Resolving the lazy user loads the session and may query the
+        # database, so only the check goes to a thread; the view stays async
+        response = await sync_to_async(self.check_timeout)(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+
+class RequestProfilingMiddleware(AsyncCapableMiddleware):
+    """Opt-in (settings.REQUEST_PROFILING) per-request timings.
+
+    Adds a Server-Timing header (total, db, tpl) and logs one JSON line per
+    request. With REQUEST_PROFILING_SAMPLE_RATE or REQUEST_PROFILING_SLOW_MS
+    set it also writes cProfile dumps to REQUEST_PROFILING_DIR; catching slow
+    requests means profiling every request and keeping only the slow ones.
+    Under ASGI a profile only sees the event loop thread, and requests that
+    start while another is being profiled go unprofiled.
+    """
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.slow_threshold = settings.REQUEST_PROFILING_SLOW_MS / 1000
+        # Only one cProfile can be active per thread (the event loop's, under ASGI)
+        self.profiling = False
+        profiling.install()
+
+    def start(self):
+        """(stats, context token, profile or None, sampled) for a new request"""
+        stats = profiling.RequestStats()
+        token = profiling.current_stats.set(stats)
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        profile = cProfile.Profile() if (sampled or self.slow_threshold) and not self.profiling else None
+        return stats, token, profile, sampled
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token, profile, sampled = self.start()
+        try:
+            if profile:
+                response = profile.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        finally:
+            profiling.current_stats.reset(token)
+        return self.finish(request, response, stats, profile, sampled)
+
+    async def __acall__(self, request):
+        stats, token, profile, sampled = self.start()
+        if profile:
+            self.profiling = True
+            profile.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if profile:
+                profile.disable()
+                self.profiling = False
+            profiling.current_stats.reset(token)
+        if profile:
+            # May write a dump file
+            return await sync_to_async(self.finish, thread_sensitive=False)(request, response, stats, profile, sampled)
+        return self.finish(request, response, stats, profile, sampled)
+
+    def finish(self, request, response, stats, profile, sampled):
+        elapsed = stats.elapsed()
+        response['Server-Timing'] = profiling.server_timing(stats, elapsed)
+        
+        dump = None
+        if profile and (sampled or elapsed >= self.slow_threshold):
+            try:
+                dump = profiling.dump_profile(
+                    profile, settings.REQUEST_PROFILING_DIR, settings.REQUEST_PROFILING_KEEP, request, elapsed,
+                )
+            except OSError:
+                profiling_logger.exception('Could not write the request profile')
+        
+        match = request.resolver_match
+        profiling_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(elapsed * 1000, 2),
+            'db_ms': round(stats.db_time * 1000, 2),
+            'db_queries': stats.queries,
+            'template_ms': round(stats.template_time * 1000, 2),
+            'profile': dump,
+        }))
+        return response
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Feeds the Prometheus request latency and query counters (see metrics.py)"""
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        profiling.install()
+
+    def start(self):
+        """(stats, context token or None); shares RequestProfilingMiddleware's stats when it runs too"""
+        stats = profiling.current_stats.get()
+        if stats is not None:
+            return stats, None
+        stats = profiling.RequestStats()
+        return stats, profiling.current_stats.set(stats)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                profiling.current_stats.reset(token)
+        
+        metrics.record_request(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                profiling.current_stats.reset(token)
         
-        response = self.get_response(request)
-        return response 
\ No newline at end of file
+        metrics.record_request(request, response, time.perf_counter() - started, stats)
+        return response
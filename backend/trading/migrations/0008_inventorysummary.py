@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:23
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0007_alter_inventory_discount_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_items', models.IntegerField(default=0, verbose_name='Total Items')),
+                ('total_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Total Stock Value')),
+                ('low_stock_items', models.IntegerField(default=0, verbose_name='Low Stock Items')),
+                ('out_of_stock_items', models.IntegerField(default=0, verbose_name='Out of Stock Items')),
+                ('last_rebuilt', models.DateTimeField(blank=True, null=True, verbose_name='Last Rebuilt')),
+            ],
+            options={
+                'verbose_name': 'Inventory Summary',
+                'verbose_name_plural': 'Inventory Summary',
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:24
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    sources = [
+        ('Sale', 'DailySalesRollup', 'sale_date', 'cashier', 'quantity_sold', 'total_amount'),
+        ('BuyItem', 'DailyPurchaseRollup', 'purchase_date', 'buyer', 'quantity_bought', 'total_cost'),
+    ]
+    for source_name, rollup_name, date_field, user_field, units_field, amount_field in sources:
+        source = apps.get_model('trading', source_name)
+        rollup = apps.get_model('trading', rollup_name)
+        rows = (
+            source.objects.order_by()
+            .annotate(day=TruncDate(date_field, tzinfo=timezone.get_current_timezone()))
+            .values('day', user_field)
+            .annotate(count=Count('id'), units=Sum(units_field), amount=Sum(amount_field))
+        )
+        rollup.objects.bulk_create(
+            [
+                rollup(**{
+                    'day': row['day'],
+                    f'{user_field}_id': row[user_field],
+                    'transaction_count': row['count'],
+                    'units': row['units'] or 0,
+                    'amount': row['amount'] or Decimal('0.00'),
+                })
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trading', '0008_inventorysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='Transactions')),
+                ('units', models.IntegerField(default=0, verbose_name='Units')),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Amount')),
+                ('cashier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Cashier')),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'verbose_name_plural': 'Daily Sales Rollups',
+                'ordering': ['-day'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPurchaseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='Transactions')),
+                ('units', models.IntegerField(default=0, verbose_name='Units')),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Amount')),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Buyer')),
+            ],
+            options={
+                'verbose_name': 'Daily Purchase Rollup',
+                'verbose_name_plural': 'Daily Purchase Rollups',
+                'ordering': ['-day'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'cashier'), name='unique_daily_sales_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailypurchaserollup',
+            constraint=models.UniqueConstraint(fields=('day', 'buyer'), name='unique_daily_purchase_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
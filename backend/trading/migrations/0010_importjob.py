@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trading', '0009_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('csv_file', models.FileField(upload_to='imports/', verbose_name='CSV File')),
+                ('original_name', models.CharField(blank=True, max_length=255, verbose_name='File Name')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total Rows')),
+                ('rows_done', models.PositiveIntegerField(default=0, verbose_name='Rows Done')),
+                ('imported_count', models.PositiveIntegerField(default=0, verbose_name='Imported')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Updated')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Errors')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Error Messages')),
+                ('failure_reason', models.TextField(blank=True, verbose_name='Failure Reason')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Import Job',
+                'verbose_name_plural': 'Import Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
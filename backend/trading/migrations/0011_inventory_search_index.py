@@ -0,0 +1,103 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+FTS_COLUMNS = 'item_name, brand, model, description, serial_number'
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE trading_inventory_fts USING fts5(
+        {FTS_COLUMNS},
+        content='trading_inventory',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER trading_inventory_fts_ai AFTER INSERT ON trading_inventory BEGIN
+        INSERT INTO trading_inventory_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.item_name, new.brand, new.model, new.description, new.serial_number);
+    END
+    """,
+    f"""
+    CREATE TRIGGER trading_inventory_fts_ad AFTER DELETE ON trading_inventory BEGIN
+        INSERT INTO trading_inventory_fts(trading_inventory_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.item_name, old.brand, old.model, old.description, old.serial_number);
+    END
+    """,
+    f"""
+    CREATE TRIGGER trading_inventory_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON trading_inventory BEGIN
+        INSERT INTO trading_inventory_fts(trading_inventory_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.item_name, old.brand, old.model, old.description, old.serial_number);
+        INSERT INTO trading_inventory_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.item_name, new.brand, new.model, new.description, new.serial_number);
+    END
+    """,
+    "INSERT INTO trading_inventory_fts(trading_inventory_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS trading_inventory_fts_au",
+    "DROP TRIGGER IF EXISTS trading_inventory_fts_ad",
+    "DROP TRIGGER IF EXISTS trading_inventory_fts_ai",
+    "DROP TABLE IF EXISTS trading_inventory_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS trading_inventory_search_tsv ON trading_inventory USING gin (
+        to_tsvector('simple', coalesce(item_name, '') || ' ' || coalesce(brand, '') || ' ' ||
+        coalesce(model, '') || ' ' || coalesce(description, '') || ' ' || coalesce(serial_number, ''))
+    )
+    """,
+    # Django's icontains on PostgreSQL compiles to UPPER(col::text) LIKE UPPER(%s)
+    "CREATE INDEX IF NOT EXISTS trading_inventory_item_name_trgm ON trading_inventory USING gin (UPPER(item_name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS trading_inventory_brand_trgm ON trading_inventory USING gin (UPPER(brand::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS trading_inventory_model_trgm ON trading_inventory USING gin (UPPER(model::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS trading_inventory_serial_trgm ON trading_inventory USING gin (UPPER(serial_number::text) gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS trading_inventory_serial_trgm",
+    "DROP INDEX IF EXISTS trading_inventory_model_trgm",
+    "DROP INDEX IF EXISTS trading_inventory_brand_trgm",
+    "DROP INDEX IF EXISTS trading_inventory_item_name_trgm",
+    "DROP INDEX IF EXISTS trading_inventory_search_tsv",
+]
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            run_statements(schema_editor, SQLITE_FORWARD)
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE queries
+            run_statements(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0010_importjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
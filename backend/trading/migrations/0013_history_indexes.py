@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:33
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0012_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buyitem',
+            index=models.Index(fields=['purchase_date', 'id'], name='buyitem_purchase_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['item_name'], name='inventory_item_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(django.db.models.functions.text.Upper('brand'), django.db.models.functions.text.Upper('model'), name='inventory_brand_model_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sale_date', 'id'], name='sale_sale_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['user', 'is_active'], name='timelog_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['time_in', 'id'], name='timelog_time_in_idx'),
+        ),
+    ]
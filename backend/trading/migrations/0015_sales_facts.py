@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:57
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_sale_unit_cost(apps, schema_editor):
+    # Older sales did not record their cost; the item's current cost is the
+    # best estimate left
+    Sale = apps.get_model('trading', 'Sale')
+    Inventory = apps.get_model('trading', 'Inventory')
+    Sale.objects.filter(unit_cost__isnull=True).update(
+        unit_cost=Subquery(Inventory.objects.filter(id=OuterRef('item_id')).values('unit_cost')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trading', '0014_inventory_last_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='Key')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Position')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Refresh Watermark',
+                'verbose_name_plural': 'Refresh Watermarks',
+            },
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text="The item's unit cost when it was sold", max_digits=10, null=True, verbose_name='Unit Cost'),
+        ),
+        migrations.CreateModel(
+            name='SalesFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('week', models.DateField(verbose_name='Week')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('brand', models.CharField(max_length=100, verbose_name='Brand')),
+                ('payment_method', models.CharField(max_length=50, verbose_name='Payment Method')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='Transactions')),
+                ('units', models.IntegerField(default=0, verbose_name='Units')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Revenue')),
+                ('cost', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18, verbose_name='Cost')),
+                ('cashier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Cashier')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.inventory', verbose_name='Item')),
+            ],
+            options={
+                'verbose_name': 'Sales Fact',
+                'verbose_name_plural': 'Sales Facts',
+                'indexes': [models.Index(fields=['day', 'week', 'month', 'brand', 'cashier', 'payment_method', 'units', 'revenue', 'cost', 'transaction_count'], name='salesfact_day_idx'), models.Index(fields=['brand', 'day', 'week', 'month', 'units', 'revenue', 'cost', 'transaction_count'], name='salesfact_brand_day_idx'), models.Index(fields=['item', 'day', 'week', 'month', 'units', 'revenue', 'cost', 'transaction_count'], name='salesfact_item_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='salesfact',
+            constraint=models.UniqueConstraint(fields=('day', 'item', 'brand', 'cashier', 'payment_method'), name='unique_sales_fact'),
+        ),
+        migrations.RunPython(backfill_sale_unit_cost, migrations.RunPython.noop),
+    ]
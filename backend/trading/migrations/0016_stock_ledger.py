@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def record_opening_stock(apps, schema_editor):
+    # Stock on hand before the ledger existed becomes each item's opening movement
+    Inventory = apps.get_model('trading', 'Inventory')
+    StockMovement = apps.get_model('trading', 'StockMovement')
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            item_id=item_id,
+            reason='opening',
+            quantity_change=quantity,
+            unit_cost=unit_cost,
+            reference='Stock on hand when the ledger started',
+        )
+        for item_id, quantity, unit_cost in Inventory.objects.filter(quantity__gt=0).values_list('id', 'quantity', 'unit_cost')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trading', '0015_sales_facts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('opening', 'Opening Stock'), ('sale', 'Sale'), ('purchase', 'Purchase'), ('adjustment', 'Adjustment'), ('import', 'CSV Import'), ('correction', 'Ledger Correction')], max_length=20, verbose_name='Reason')),
+                ('quantity_change', models.IntegerField(verbose_name='Quantity Change')),
+                ('unit_cost', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Unit Cost')),
+                ('reference', models.CharField(blank=True, max_length=100, verbose_name='Reference')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Recorded At')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.inventory', verbose_name='Item')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Recorded By')),
+            ],
+            options={
+                'verbose_name': 'Stock Movement',
+                'verbose_name_plural': 'Stock Movements',
+                'indexes': [models.Index(fields=['created_at', 'id'], name='stockmovement_created_idx'), models.Index(fields=['item', 'created_at'], name='stockmovement_item_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField(verbose_name='As Of')),
+                ('quantity', models.IntegerField(verbose_name='Quantity')),
+                ('unit_cost', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Unit Cost')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.inventory', verbose_name='Item')),
+            ],
+            options={
+                'verbose_name': 'Stock Checkpoint',
+                'verbose_name_plural': 'Stock Checkpoints',
+                'indexes': [models.Index(fields=['as_of'], name='stockcheckpoint_as_of_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stockcheckpoint',
+            constraint=models.UniqueConstraint(fields=('item', 'as_of'), name='unique_stock_checkpoint'),
+        ),
+        migrations.RunPython(record_opening_stock, migrations.RunPython.noop),
+    ]
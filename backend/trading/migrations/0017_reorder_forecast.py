@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0016_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('velocity', models.FloatField(default=0, verbose_name='Units per Day')),
+                ('demand_std', models.FloatField(default=0, verbose_name='Daily Demand Std. Dev.')),
+                ('days_of_cover', models.FloatField(blank=True, null=True, verbose_name='Days of Cover')),
+                ('safety_stock', models.IntegerField(default=0, verbose_name='Safety Stock')),
+                ('reorder_point', models.IntegerField(default=0, verbose_name='Reorder Point')),
+                ('suggested_quantity', models.IntegerField(default=0, verbose_name='Suggested Order')),
+                ('status', models.CharField(choices=[('out_of_stock', 'Out of Stock'), ('reorder', 'Reorder'), ('ok', 'OK'), ('overstock', 'Overstock'), ('no_demand', 'No Demand')], max_length=20, verbose_name='Status')),
+                ('computed_at', models.DateTimeField(verbose_name='Computed At')),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='trading.inventory', verbose_name='Item')),
+            ],
+            options={
+                'verbose_name': 'Reorder Forecast',
+                'verbose_name_plural': 'Reorder Forecasts',
+                'indexes': [models.Index(fields=['status', 'days_of_cover'], name='reorderforecast_status_idx')],
+            },
+        ),
+    ]
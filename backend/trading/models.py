@@ -1,8 +1,33 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, Upper
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.contrib.auth.models import User
+from datetime import datetime, time, timedelta
 from django.utils import timezone
+from . import metrics
+from .thumbnails import THUMBNAIL_ERRORS, generate_thumbnails
+
+LOW_STOCK_THRESHOLD = 5
+
+def local_day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def day_range_lookup(date_field, start_date=None, end_date=None):
+    """Filter kwargs selecting local calendar days start_date..end_date (inclusive).
+
+    Unlike ``__date`` lookups, which wrap the column in a cast, these are
+    plain ``>=``/``<`` comparisons that can use an index on the column.
+    """
+    lookup = {}
+    if start_date:
+        lookup[f'{date_field}__gte'] = local_day_start(start_date)
+    if end_date:
+        lookup[f'{date_field}__lt'] = local_day_start(end_date + timedelta(days=1))
+    return lookup
 
 class TimeLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Employee")
@@ -15,6 +40,10 @@ class TimeLog(models.Model):
         verbose_name = "Time Log"
         verbose_name_plural = "Time Logs"
         ordering = ['-time_in']
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='timelog_user_active_idx'),
+            models.Index(fields=['time_in', 'id'], name='timelog_time_in_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.time_in.strftime('%Y-%m-%d %H:%M')}"
@@ -47,16 +76,38 @@ class BuyItem(models.Model):
         verbose_name = "Buy Item"
         verbose_name_plural = "Buy Items"
         ordering = ['-purchase_date']
+        indexes = [
+            models.Index(fields=['purchase_date', 'id'], name='buyitem_purchase_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.item.item_name} - {self.quantity_bought} units - {self.purchase_date.strftime('%Y-%m-%d %H:%M')}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in ('purchase_date', 'buyer_id', 'quantity_bought', 'total_cost')):
+            instance._rollup_snapshot = instance.rollup_entry()
+        return instance
+    
+    def rollup_entry(self):
+        return (timezone.localdate(self.purchase_date), self.buyer_id, self.quantity_bought, self.total_cost)
+    
     def save(self, *args, **kwargs):
         if not self.total_cost:
             self.total_cost = self.quantity_bought * self.unit_cost
-        super().save(*args, **kwargs)
+        previous = getattr(self, '_rollup_snapshot', None)
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            current = self.rollup_entry()
+            DailyPurchaseRollup.apply_changes([(previous, current)])
+            if adding:
+                transaction.on_commit(lambda: metrics.record_purchases(1, self.total_cost))
+        self._rollup_snapshot = current
         
         self.item.quantity += self.quantity_bought
+        self.item.note_movement(StockMovement.PURCHASE, f"Purchase #{self.pk}", self.buyer_id)
         self.item.save()
 
 class Sale(models.Model):
@@ -69,22 +120,54 @@ class Sale(models.Model):
     customer_name = models.CharField(max_length=100, blank=True, verbose_name="Customer Name")
     payment_method = models.CharField(max_length=50, default="Cash", verbose_name="Payment Method")
     notes = models.TextField(blank=True, verbose_name="Notes")
+    unit_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Unit Cost",
+        help_text="The item's unit cost when it was sold"
+    )
     
     class Meta:
         verbose_name = "Sale"
         verbose_name_plural = "Sales"
         ordering = ['-sale_date']
+        indexes = [
+            models.Index(fields=['sale_date', 'id'], name='sale_sale_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.item.item_name} - {self.quantity_sold} units - {self.sale_date.strftime('%Y-%m-%d %H:%M')}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in ('sale_date', 'cashier_id', 'quantity_sold', 'total_amount')):
+            instance._rollup_snapshot = instance.rollup_entry()
+        return instance
+    
+    def rollup_entry(self):
+        return (timezone.localdate(self.sale_date), self.cashier_id, self.quantity_sold, self.total_amount)
+    
     def save(self, *args, **kwargs):
         if not self.total_amount:
             self.total_amount = self.quantity_sold * self.unit_price
-        super().save(*args, **kwargs)
+        if self.unit_cost is None:
+            self.unit_cost = self.item.unit_cost
+        previous = getattr(self, '_rollup_snapshot', None)
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            current = self.rollup_entry()
+            DailySalesRollup.apply_changes([(previous, current)])
+            if adding:
+                transaction.on_commit(lambda: metrics.record_sales(1, self.total_amount))
+        self._rollup_snapshot = current
         
         if self.item.quantity >= self.quantity_sold:
             self.item.quantity -= self.quantity_sold
+            self.item.note_movement(StockMovement.SALE, f"Sale #{self.pk}", self.cashier_id)
             self.item.save()
 
 class Inventory(models.Model):
@@ -144,15 +227,77 @@ class Inventory(models.Model):
         verbose_name = "Inventory Item"
         verbose_name_plural = "Inventory Items"
         ordering = ['item_name']
+        indexes = [
+            models.Index(fields=['item_name'], name='inventory_item_name_idx'),
+            # updated_since filters in the inventory API
+            models.Index(fields=['last_updated'], name='inventory_last_updated_idx'),
+            # brand__iexact/model__iexact compile to UPPER(col) = UPPER(%s) on PostgreSQL
+            models.Index(Upper('brand'), Upper('model'), name='inventory_brand_model_ci_idx'),
+        ]
+    
+    # Fields indexed by the cashier typeahead; changing any of them bumps
+    # the catalog version
+    CATALOG_FIELDS = ('item_name', 'brand', 'model', 'serial_number')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'quantity' in field_names and 'unit_cost' in field_names:
+            instance._stock_snapshot = (instance.quantity, instance.unit_cost)
+        if all(name in field_names for name in cls.CATALOG_FIELDS):
+            instance._catalog_snapshot = instance.catalog_entry()
+        if 'item_picture' in field_names:
+            instance._picture_snapshot = instance.item_picture.name
+        return instance
+    
+    def catalog_entry(self):
+        return tuple(getattr(self, name) for name in self.CATALOG_FIELDS)
     
     def clean(self):
         """Convert empty serial numbers to None to avoid unique constraint violations"""
         if self.serial_number == '':
             self.serial_number = None
     
+    def note_movement(self, reason, reference='', user_id=None):
+        """Label the stock change the next save() appends to the StockMovement ledger"""
+        self._movement_note = (reason, reference, user_id)
+    
+    def _previous_stock(self):
+        """(quantity, unit_cost) as last stored in the database, or None for new rows"""
+        snapshot = getattr(self, '_stock_snapshot', None)
+        if snapshot is None and self.pk and not self._state.adding:
+            snapshot = Inventory.objects.filter(pk=self.pk).values_list('quantity', 'unit_cost').first()
+        return snapshot
+    
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        previous = self._previous_stock()
+        catalog_changed = getattr(self, '_catalog_snapshot', None) != self.catalog_entry()
+        movement_note = getattr(self, '_movement_note', None) or (StockMovement.ADJUSTMENT,)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            current = (self.quantity, self.unit_cost)
+            InventorySummary.apply_change(previous, current)
+            movement = StockMovement.for_change(self.pk, previous, current, *movement_note)
+            if movement is not None:
+                movement.save()
+            # Sale.save and BuyItem.save reach this through item.save()
+            CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+            if catalog_changed:
+                CacheVersion.bump(CacheVersion.INVENTORY_CATALOG)
+        self._stock_snapshot = current
+        self._catalog_snapshot = self.catalog_entry()
+        self._movement_note = None
+        
+        if self.item_picture and self.item_picture.name != getattr(self, '_picture_snapshot', None):
+            try:
+                # Forced, in case an earlier picture stored under this name
+                # left its thumbnails behind
+                generate_thumbnails(self.item_picture, force=True)
+            except THUMBNAIL_ERRORS:
+                # Left to the lazy path, which falls back to the original
+                pass
+        self._picture_snapshot = self.item_picture.name
     
     def __str__(self):
         return f"{self.brand} {self.model} - {self.item_name}"
@@ -171,7 +316,574 @@ class Inventory(models.Model):
     def stock_status(self):
         if self.quantity == 0:
             return "Out of Stock"
-        elif self.quantity <= 5:
+        elif self.quantity <= LOW_STOCK_THRESHOLD:
             return "Low Stock"
         else:
-            return "In Stock"
\ No newline at end of file
+            return "In Stock"
+
+
+@receiver(post_delete, sender=Inventory)
+def remove_inventory_from_summary(sender, instance, **kwargs):
+    previous = getattr(instance, '_stock_snapshot', None) or (instance.quantity, instance.unit_cost)
+    InventorySummary.apply_change(previous, None)
+    CacheVersion.bump(CacheVersion.INVENTORY_CATALOG)
+    CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+
+
+class CacheVersion(models.Model):
+    """Named counters shared by every worker process.
+
+    Per-process caches remember the version they were built from and
+    rebuild when the stored value moves on.
+    """
+    INVENTORY_CATALOG = 'inventory_catalog'
+    INVENTORY_GRID = 'inventory_grid'
+    
+    key = models.CharField(max_length=50, unique=True, verbose_name="Key")
+    version = models.BigIntegerField(default=0, verbose_name="Version")
+    
+    class Meta:
+        verbose_name = "Cache Version"
+        verbose_name_plural = "Cache Versions"
+    
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+    
+    @classmethod
+    def get(cls, key):
+        return cls.objects.filter(key=key).values_list('version', flat=True).first() or 0
+    
+    @classmethod
+    def bump(cls, key):
+        if cls.objects.filter(key=key).update(version=F('version') + 1):
+            return
+        _, created = cls.objects.get_or_create(key=key, defaults={'version': 1})
+        if not created:
+            cls.objects.filter(key=key).update(version=F('version') + 1)
+
+
+class InventorySummary(models.Model):
+    """Single-row running totals for the dashboard header stats.
+
+    Kept up to date with deltas from Inventory writes (which also covers the
+    stock changes made by Sale.save and BuyItem.save). Bulk queryset updates
+    bypass it; run ``manage.py rebuild_inventory_summary`` after those.
+    """
+    total_items = models.IntegerField(default=0, verbose_name="Total Items")
+    total_value = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'), verbose_name="Total Stock Value")
+    low_stock_items = models.IntegerField(default=0, verbose_name="Low Stock Items")
+    out_of_stock_items = models.IntegerField(default=0, verbose_name="Out of Stock Items")
+    last_rebuilt = models.DateTimeField(null=True, blank=True, verbose_name="Last Rebuilt")
+    
+    SINGLETON_ID = 1
+    
+    class Meta:
+        verbose_name = "Inventory Summary"
+        verbose_name_plural = "Inventory Summary"
+    
+    def __str__(self):
+        return f"{self.total_items} items - {self.total_value:,.2f}"
+    
+    @staticmethod
+    def compute(queryset=None):
+        """Aggregate the header stats for a queryset in a single query"""
+        if queryset is None:
+            queryset = Inventory.objects.all()
+        value = ExpressionWrapper(F('unit_cost') * F('quantity'), output_field=DecimalField(max_digits=18, decimal_places=2))
+        stats = queryset.order_by().aggregate(
+            total_items=Count('id'),
+            total_value=Coalesce(Sum(value), Decimal('0.00'), output_field=DecimalField(max_digits=18, decimal_places=2)),
+            low_stock_items=Count('id', filter=Q(quantity__lte=LOW_STOCK_THRESHOLD)),
+            out_of_stock_items=Count('id', filter=Q(quantity=0)),
+        )
+        return stats
+    
+    @classmethod
+    def rebuild(cls):
+        stats = cls.compute()
+        summary, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_ID,
+            defaults=dict(stats, last_rebuilt=timezone.now()),
+        )
+        return summary
+    
+    @classmethod
+    def current(cls):
+        summary = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        if summary is None:
+            summary = cls.rebuild()
+        return summary
+    
+    @staticmethod
+    def _contribution(stock):
+        if stock is None:
+            return 0, Decimal('0'), 0, 0
+        quantity, unit_cost = stock
+        quantity = int(quantity)
+        value = Decimal(str(unit_cost)) * quantity
+        return 1, value, int(quantity <= LOW_STOCK_THRESHOLD), int(quantity == 0)
+    
+    @classmethod
+    def apply_changes(cls, changes):
+        """Apply (previous, current) stock pairs as one delta update.
+
+        Each side is a (quantity, unit_cost) tuple, or None when the row was
+        created (no previous) or deleted (no current).
+        """
+        delta = [0, Decimal('0'), 0, 0]
+        for previous, current in changes:
+            before = cls._contribution(previous)
+            after = cls._contribution(current)
+            for i in range(4):
+                delta[i] += after[i] - before[i]
+        if not any(delta):
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            total_items=F('total_items') + delta[0],
+            total_value=F('total_value') + delta[1],
+            low_stock_items=F('low_stock_items') + delta[2],
+            out_of_stock_items=F('out_of_stock_items') + delta[3],
+        )
+        if not updated:
+            # First write since the summary was created (or after it was
+            # cleared): the rebuild already includes this change.
+            cls.rebuild()
+    
+    @classmethod
+    def apply_change(cls, previous, current):
+        cls.apply_changes([(previous, current)])
+
+
+@receiver(post_delete, sender=Sale)
+def remove_sale_from_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_snapshot', None) or instance.rollup_entry()
+    DailySalesRollup.apply_changes([(previous, None)])
+
+
+@receiver(post_delete, sender=BuyItem)
+def remove_purchase_from_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_snapshot', None) or instance.rollup_entry()
+    DailyPurchaseRollup.apply_changes([(previous, None)])
+
+
+class DailyRollup(models.Model):
+    """Per-day, per-user transaction totals maintained alongside the source rows.
+
+    Entries passed to ``apply_changes`` are (day, user_id, units, amount)
+    tuples as returned by ``Sale.rollup_entry``/``BuyItem.rollup_entry``.
+    """
+    day = models.DateField(verbose_name="Day")
+    transaction_count = models.IntegerField(default=0, verbose_name="Transactions")
+    units = models.IntegerField(default=0, verbose_name="Units")
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'), verbose_name="Amount")
+    
+    # Name of the user foreign key on the concrete model, and the source
+    # model's (date, user, units, amount) fields used by rebuild().
+    user_field = None
+    source_fields = None
+    
+    class Meta:
+        abstract = True
+        ordering = ['-day']
+    
+    @classmethod
+    def apply_changes(cls, changes):
+        deltas = {}
+        for previous, current in changes:
+            for entry, sign in ((previous, -1), (current, 1)):
+                if entry is None:
+                    continue
+                day, user_id, units, amount = entry
+                delta = deltas.setdefault((day, user_id), [0, 0, Decimal('0')])
+                delta[0] += sign
+                delta[1] += sign * int(units)
+                delta[2] += sign * Decimal(str(amount))
+        
+        user_key = f'{cls.user_field}_id'
+        for (day, user_id), (count, units, amount) in deltas.items():
+            if not (count or units or amount):
+                continue
+            lookup = {'day': day, user_key: user_id}
+            increments = {
+                'transaction_count': F('transaction_count') + count,
+                'units': F('units') + units,
+                'amount': F('amount') + amount,
+            }
+            if cls.objects.filter(**lookup).update(**increments):
+                continue
+            _, created = cls.objects.get_or_create(
+                defaults={'transaction_count': count, 'units': units, 'amount': amount},
+                **lookup
+            )
+            if not created:
+                # Another writer created the row between our update and insert
+                cls.objects.filter(**lookup).update(**increments)
+    
+    @classmethod
+    def totals(cls, queryset=None):
+        if queryset is None:
+            queryset = cls.objects.all()
+        return queryset.order_by().aggregate(
+            transaction_count=Coalesce(Sum('transaction_count'), 0),
+            amount=Coalesce(Sum('amount'), Decimal('0.00'), output_field=DecimalField(max_digits=18, decimal_places=2)),
+        )
+    
+    @classmethod
+    def rebuild(cls, start_date=None, end_date=None):
+        """Recompute rollup rows from the source table, optionally for a date range"""
+        source_model = cls.source_model()
+        date_field, user_field, units_field, amount_field = cls.source_fields
+        
+        source = source_model.objects.all()
+        rollups = cls.objects.all()
+        source = source.filter(**day_range_lookup(date_field, start_date, end_date))
+        if start_date:
+            rollups = rollups.filter(day__gte=start_date)
+        if end_date:
+            rollups = rollups.filter(day__lte=end_date)
+        
+        rows = (
+            source.order_by()
+            .annotate(rollup_day=TruncDate(date_field, tzinfo=timezone.get_current_timezone()))
+            .values('rollup_day', user_field)
+            .annotate(
+                rollup_count=Count('id'),
+                rollup_units=Coalesce(Sum(units_field), 0),
+                rollup_amount=Coalesce(Sum(amount_field), Decimal('0.00'), output_field=DecimalField(max_digits=18, decimal_places=2)),
+            )
+        )
+        user_key = f'{cls.user_field}_id'
+        with transaction.atomic():
+            rollups.delete()
+            created = cls.objects.bulk_create(
+                (
+                    cls(**{
+                        'day': row['rollup_day'],
+                        user_key: row[user_field],
+                        'transaction_count': row['rollup_count'],
+                        'units': row['rollup_units'],
+                        'amount': row['rollup_amount'],
+                    })
+                    for row in rows.iterator()
+                ),
+                batch_size=1000,
+            )
+        return len(created)
+
+
+class DailySalesRollup(DailyRollup):
+    cashier = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Cashier")
+    
+    user_field = 'cashier'
+    source_fields = ('sale_date', 'cashier', 'quantity_sold', 'total_amount')
+    
+    class Meta(DailyRollup.Meta):
+        verbose_name = "Daily Sales Rollup"
+        verbose_name_plural = "Daily Sales Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'cashier'], name='unique_daily_sales_rollup'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.cashier.username} - {self.transaction_count} sales"
+    
+    @staticmethod
+    def source_model():
+        return Sale
+
+
+class DailyPurchaseRollup(DailyRollup):
+    buyer = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Buyer")
+    
+    user_field = 'buyer'
+    source_fields = ('purchase_date', 'buyer', 'quantity_bought', 'total_cost')
+    
+    class Meta(DailyRollup.Meta):
+        verbose_name = "Daily Purchase Rollup"
+        verbose_name_plural = "Daily Purchase Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'buyer'], name='unique_daily_purchase_rollup'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.buyer.username} - {self.transaction_count} purchases"
+    
+    @staticmethod
+    def source_model():
+        return BuyItem
+
+
+class ImportJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    MAX_STORED_ERRORS = 100
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Uploaded By")
+    csv_file = models.FileField(upload_to='imports/', verbose_name="CSV File")
+    original_name = models.CharField(max_length=255, blank=True, verbose_name="File Name")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    total_rows = models.PositiveIntegerField(null=True, blank=True, verbose_name="Total Rows")
+    rows_done = models.PositiveIntegerField(default=0, verbose_name="Rows Done")
+    imported_count = models.PositiveIntegerField(default=0, verbose_name="Imported")
+    updated_count = models.PositiveIntegerField(default=0, verbose_name="Updated")
+    error_count = models.PositiveIntegerField(default=0, verbose_name="Errors")
+    errors = models.JSONField(default=list, blank=True, verbose_name="Error Messages")
+    failure_reason = models.TextField(blank=True, verbose_name="Failure Reason")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started At")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished At")
+    # Bumped with every progress update; a running job whose heartbeat goes
+    # stale lost its worker and is put back in the queue
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Last Progress")
+    
+    class Meta:
+        verbose_name = "Import Job"
+        verbose_name_plural = "Import Jobs"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.original_name or self.csv_file.name} - {self.get_status_display()}"
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+    
+    @property
+    def progress_percent(self):
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(self.rows_done * 100 / self.total_rows))
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'file_name': self.original_name,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'total_rows': self.total_rows,
+            'rows_done': self.rows_done,
+            'progress_percent': self.progress_percent,
+            'imported_count': self.imported_count,
+            'updated_count': self.updated_count,
+            'error_count': self.error_count,
+            'errors': self.errors[:5],
+            'failure_reason': self.failure_reason,
+            'is_finished': self.is_finished,
+        }
+
+
+class RefreshWatermark(models.Model):
+    """How far an incrementally refreshed table has read its source (e.g. the last Sale id)"""
+    SALES_FACTS = 'sales_facts'
+    
+    key = models.CharField(max_length=50, unique=True, verbose_name="Key")
+    position = models.BigIntegerField(default=0, verbose_name="Position")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        verbose_name = "Refresh Watermark"
+        verbose_name_plural = "Refresh Watermarks"
+    
+    def __str__(self):
+        return f"{self.key} @ {self.position}"
+
+
+class SalesFact(models.Model):
+    """Sales pre-aggregated per local day, item, brand, cashier and payment method.
+
+    Maintained by backend/trading/analytics.py from new Sale rows; cost uses
+    Sale.unit_cost, the item's cost at the time of sale. week (its Monday)
+    and month (its 1st) are stored so grouping by them needs no date
+    functions.
+    """
+    day = models.DateField(verbose_name="Day")
+    week = models.DateField(verbose_name="Week")
+    month = models.DateField(verbose_name="Month")
+    item = models.ForeignKey(Inventory, on_delete=models.CASCADE, verbose_name="Item")
+    brand = models.CharField(max_length=100, verbose_name="Brand")
+    cashier = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Cashier")
+    payment_method = models.CharField(max_length=50, verbose_name="Payment Method")
+    transaction_count = models.IntegerField(default=0, verbose_name="Transactions")
+    units = models.IntegerField(default=0, verbose_name="Units")
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'), verbose_name="Revenue")
+    cost = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'), verbose_name="Cost")
+    
+    class Meta:
+        verbose_name = "Sales Fact"
+        verbose_name_plural = "Sales Facts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'item', 'brand', 'cashier', 'payment_method'], name='unique_sales_fact',
+            ),
+        ]
+        # The measures ride along so date, brand and item slices are
+        # answered from an index alone, without a lookup per fact
+        indexes = [
+            models.Index(
+                fields=['day', 'week', 'month', 'brand', 'cashier', 'payment_method', 'units', 'revenue', 'cost', 'transaction_count'],
+                name='salesfact_day_idx',
+            ),
+            models.Index(
+                fields=['brand', 'day', 'week', 'month', 'units', 'revenue', 'cost', 'transaction_count'], name='salesfact_brand_day_idx',
+            ),
+            models.Index(
+                fields=['item', 'day', 'week', 'month', 'units', 'revenue', 'cost', 'transaction_count'], name='salesfact_item_day_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.brand} - {self.item_id} - {self.units} units"
+
+
+class StockMovement(models.Model):
+    """Append-only ledger of every change to an item's stock.
+
+    Inventory.save() appends one row per save that changes quantity or unit
+    cost, labelled by Inventory.note_movement(); bulk writers (checkout, batch
+    updates, CSV imports) append theirs with bulk_create. unit_cost is the
+    item's cost after the movement, for point-in-time valuation.
+    """
+    OPENING = 'opening'
+    SALE = 'sale'
+    PURCHASE = 'purchase'
+    ADJUSTMENT = 'adjustment'
+    IMPORT = 'import'
+    CORRECTION = 'correction'
+    REASONS = [
+        (OPENING, 'Opening Stock'),
+        (SALE, 'Sale'),
+        (PURCHASE, 'Purchase'),
+        (ADJUSTMENT, 'Adjustment'),
+        (IMPORT, 'CSV Import'),
+        (CORRECTION, 'Ledger Correction'),
+    ]
+    
+    item = models.ForeignKey(Inventory, on_delete=models.CASCADE, verbose_name="Item")
+    reason = models.CharField(max_length=20, choices=REASONS, verbose_name="Reason")
+    quantity_change = models.IntegerField(verbose_name="Quantity Change")
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Unit Cost")
+    reference = models.CharField(max_length=100, blank=True, verbose_name="Reference")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Recorded By")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Recorded At")
+    
+    class Meta:
+        verbose_name = "Stock Movement"
+        verbose_name_plural = "Stock Movements"
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='stockmovement_created_idx'),
+            models.Index(fields=['item', 'created_at'], name='stockmovement_item_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.item_id} {self.quantity_change:+d} ({self.reason})"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only; record a correction instead")
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def for_change(cls, item_id, previous, current, reason=ADJUSTMENT, reference='', user_id=None):
+        """Unsaved movement between two (quantity, unit_cost) states of an item, or None if nothing moved.
+
+        previous is None for a new item, whose whole quantity is opening stock
+        unless another reason is given.
+        """
+        quantity, unit_cost = current
+        unit_cost = Decimal(str(unit_cost))
+        if previous is None:
+            change = int(quantity)
+            if reason == cls.ADJUSTMENT:
+                reason = cls.OPENING
+            if not change:
+                return None
+        else:
+            change = int(quantity) - int(previous[0])
+            if not change and unit_cost == Decimal(str(previous[1])):
+                return None
+        return cls(
+            item_id=item_id,
+            reason=reason,
+            quantity_change=change,
+            unit_cost=unit_cost,
+            reference=reference[:100],
+            user_id=user_id,
+        )
+
+
+class StockCheckpoint(models.Model):
+    """An item's stock and unit cost as of a checkpoint run.
+
+    Written by backend/trading/ledger.py for the items that moved since the
+    previous run, so stock at any moment is the item's latest checkpoint plus
+    the movements after it.
+    """
+    item = models.ForeignKey(Inventory, on_delete=models.CASCADE, verbose_name="Item")
+    as_of = models.DateTimeField(verbose_name="As Of")
+    quantity = models.IntegerField(verbose_name="Quantity")
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Unit Cost")
+    
+    class Meta:
+        verbose_name = "Stock Checkpoint"
+        verbose_name_plural = "Stock Checkpoints"
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'as_of'], name='unique_stock_checkpoint'),
+        ]
+        indexes = [
+            models.Index(fields=['as_of'], name='stockcheckpoint_as_of_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.item_id} @ {self.as_of:%Y-%m-%d %H:%M}: {self.quantity}"
+
+
+class ReorderForecast(models.Model):
+    """An item's demand forecast and reorder suggestion from the latest forecast run.
+
+    Written for every item at once by backend/trading/forecast.py (the
+    nightly forecast_reorders command). velocity is expected units sold per
+    day; days_of_cover is empty for items without demand.
+    """
+    REORDER = 'reorder'
+    OUT_OF_STOCK = 'out_of_stock'
+    OK = 'ok'
+    OVERSTOCK = 'overstock'
+    NO_DEMAND = 'no_demand'
+    STATUSES = [
+        (OUT_OF_STOCK, 'Out of Stock'),
+        (REORDER, 'Reorder'),
+        (OK, 'OK'),
+        (OVERSTOCK, 'Overstock'),
+        (NO_DEMAND, 'No Demand'),
+    ]
+    
+    item = models.OneToOneField(Inventory, on_delete=models.CASCADE, related_name='forecast', verbose_name="Item")
+    velocity = models.FloatField(default=0, verbose_name="Units per Day")
+    demand_std = models.FloatField(default=0, verbose_name="Daily Demand Std. Dev.")
+    days_of_cover = models.FloatField(null=True, blank=True, verbose_name="Days of Cover")
+    safety_stock = models.IntegerField(default=0, verbose_name="Safety Stock")
+    reorder_point = models.IntegerField(default=0, verbose_name="Reorder Point")
+    suggested_quantity = models.IntegerField(default=0, verbose_name="Suggested Order")
+    status = models.CharField(max_length=20, choices=STATUSES, verbose_name="Status")
+    computed_at = models.DateTimeField(verbose_name="Computed At")
+    
+    class Meta:
+        verbose_name = "Reorder Forecast"
+        verbose_name_plural = "Reorder Forecasts"
+        indexes = [
+            # The reorder report lists one status at a time, soonest to run out first
+            models.Index(fields=['status', 'days_of_cover'], name='reorderforecast_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.item_id}: {self.get_status_display()} ({self.velocity:.2f}/day)"
@@ -0,0 +1,143 @@
+import asyncio
+from django.core import signing
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = 'trading.keyset-cursor'
+
+
+class KeysetPage:
+    """One page of a (date, id) keyset pagination, newest first.
+
+    Behaves like a Django ``Page`` for iteration/truthiness, but instead of
+    page numbers it exposes opaque ``next_cursor``/``previous_cursor`` tokens
+    and never counts the whole result set.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, date_field):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.date_field = date_field
+        self.total_count = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def cursor_for(self, obj, direction):
+        return signing.dumps([direction, getattr(obj, self.date_field).isoformat(), obj.pk], salt=CURSOR_SALT)
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return self.cursor_for(self.object_list[-1], 'next')
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return self.cursor_for(self.object_list[0], 'prev')
+        return None
+
+
+def decode_cursor(token):
+    """Return (direction, datetime, id) or None for a missing or tampered token"""
+    if not token:
+        return None
+    try:
+        direction, value, pk = signing.loads(token, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    position = parse_datetime(value) if isinstance(value, str) else None
+    if direction not in ('next', 'prev') or position is None or not isinstance(pk, int):
+        return None
+    return direction, position, pk
+
+
+def keyset_slice(queryset, cursor, date_field, per_page=20):
+    """The unevaluated per_page + 1 row slice for a page, and the cursor direction"""
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        return queryset.order_by(f'-{date_field}', '-id')[:per_page + 1], None
+
+    direction, position, pk = decoded
+    if direction == 'next':
+        after = Q(**{f'{date_field}__lt': position}) | Q(**{date_field: position, 'id__lt': pk})
+        return queryset.filter(after).order_by(f'-{date_field}', '-id')[:per_page + 1], direction
+
+    before = Q(**{f'{date_field}__gt': position}) | Q(**{date_field: position, 'id__gt': pk})
+    return queryset.filter(before).order_by(date_field, 'id')[:per_page + 1], direction
+
+
+def keyset_page(rows, direction, date_field, per_page=20):
+    if direction is None:
+        return KeysetPage(rows[:per_page], len(rows) > per_page, False, date_field)
+    if direction == 'next':
+        return KeysetPage(rows[:per_page], len(rows) > per_page, True, date_field)
+    has_previous = len(rows) > per_page
+    return KeysetPage(list(reversed(rows[:per_page])), True, has_previous, date_field)
+
+
+def paginate_keyset(queryset, cursor, date_field, per_page=20):
+    """Paginate newest-first on (date_field, id) using a cursor from a previous page.
+
+    Each page is a single indexed range query of per_page + 1 rows,
+    however deep the user has paged.
+    """
+    rows, direction = keyset_slice(queryset, cursor, date_field, per_page)
+    return keyset_page(list(rows), direction, date_field, per_page)
+
+
+async def apaginate_keyset(queryset, cursor, date_field, per_page=20):
+    rows, direction = keyset_slice(queryset, cursor, date_field, per_page)
+    return keyset_page([row async for row in rows], direction, date_field, per_page)
+
+
+def estimated_count(queryset):
+    """Planner row estimate for an unfiltered PostgreSQL table; None when unavailable"""
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+async def apaginate(queryset, page_number, per_page):
+    """Async counterpart of Paginator.get_page().
+
+    The count and the requested page are fetched together; only an
+    out-of-range page number costs a second query for the last page.
+    """
+    paginator = Paginator(queryset, per_page)
+    try:
+        number = max(int(page_number), 1)
+    except (TypeError, ValueError):
+        number = 1
+
+    async def rows_for(number):
+        bottom = (number - 1) * per_page
+        return [row async for row in queryset[bottom:bottom + per_page]]
+
+    paginator.count, rows = await asyncio.gather(queryset.acount(), rows_for(number))
+    if number > paginator.num_pages:
+        number = paginator.num_pages
+        rows = await rows_for(number)
+    return Page(rows, number, paginator)
@@ -0,0 +1,134 @@
+"""Hours worked per employee, summed by the database.
+
+Each TimeLog contributes time_out - time_in (an ExpressionWrapper over a
+DurationField), or now - time_in while the session is still open. A session
+counts towards the local (settings.TIME_ZONE) day, week or pay period it
+started in. Grouping uses the Trunc/Extract functions, which apply the
+current time zone, so only one row per user and period comes back.
+
+Pay periods are semi-monthly: the 1st-15th and the 16th-end of month.
+"""
+import calendar
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Case, Count, DateField, DateTimeField, DurationField, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from .models import TimeLog, day_range_lookup
+
+PERIODS = ('day', 'week', 'pay_period')
+EXPORT_HEADER = ['Employee', 'Name', 'Period Start', 'Period End', 'Hours', 'Sessions', 'Open Sessions']
+
+
+def pay_period_bounds(day):
+    """(first, last) day of the semi-monthly pay period containing `day`"""
+    if day.day <= 15:
+        return day.replace(day=1), day.replace(day=15)
+    return day.replace(day=16), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def worked_duration(now):
+    return ExpressionWrapper(
+        Coalesce('time_out', Value(now, output_field=DateTimeField())) - F('time_in'),
+        output_field=DurationField(),
+    )
+
+
+def period_annotations(period):
+    if period == 'day':
+        return {'period': TruncDate('time_in')}
+    if period == 'week':
+        return {'period': TruncWeek('time_in', output_field=DateField())}
+    return {
+        'period': TruncMonth('time_in', output_field=DateField()),
+        'half': Case(When(time_in__day__lte=15, then=Value(1)), default=Value(2)),
+    }
+
+
+def period_bounds(period, row):
+    start = row['period']
+    if period == 'day':
+        return start, start
+    if period == 'week':
+        return start, start + timedelta(days=6)
+    return pay_period_bounds(start if row['half'] == 1 else start.replace(day=16))
+
+
+def payroll_hours(start_date, end_date, period='pay_period', usernames=None, now=None):
+    """Rows of user/period totals for sessions started on local days start_date..end_date"""
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+    now = now or timezone.now()
+
+    logs = TimeLog.objects.filter(**day_range_lookup('time_in', start_date, end_date))
+    if usernames:
+        logs = logs.filter(user__username__in=usernames)
+
+    groups = period_annotations(period)
+    totals = (
+        logs.annotate(**groups)
+        .values('user_id', 'user__username', 'user__first_name', 'user__last_name', *groups)
+        .annotate(
+            worked=Sum(worked_duration(now)),
+            sessions=Count('id'),
+            open_sessions=Count('id', filter=Q(time_out__isnull=True)),
+        )
+        .order_by('user__username', *groups)
+    )
+
+    rows = []
+    for total in totals:
+        period_start, period_end = period_bounds(period, total)
+        worked = total['worked'] or timedelta()
+        rows.append({
+            'user_id': total['user_id'],
+            'username': total['user__username'],
+            'name': f"{total['user__first_name']} {total['user__last_name']}".strip(),
+            'period_start': period_start,
+            'period_end': period_end,
+            'hours': (Decimal(worked.total_seconds()) / 3600).quantize(Decimal('0.01')),
+            'sessions': total['sessions'],
+            'open_sessions': total['open_sessions'],
+        })
+    return rows
+
+
+def export_rows(rows):
+    for row in rows:
+        yield [
+            row['username'],
+            row['name'],
+            row['period_start'].isoformat(),
+            row['period_end'].isoformat(),
+            float(row['hours']),
+            row['sessions'],
+            row['open_sessions'],
+        ]
+
+
+def write_workbook(rows, output=None):
+    """Write the rows as an .xlsx to `output` (a temporary file by default), rewound for reading"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Payroll Hours')
+    bold_font = Font(bold=True)
+    header_cells = []
+    for header in EXPORT_HEADER:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = bold_font
+        header_cells.append(cell)
+    ws.append(header_cells)
+    for row in export_rows(rows):
+        ws.append(row)
+
+    output = output or tempfile.TemporaryFile()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def default_range(today=None):
+    return pay_period_bounds(today or timezone.localdate())
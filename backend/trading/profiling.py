@@ -0,0 +1,106 @@
+"""Per-request timings for RequestProfilingMiddleware.
+
+A RequestStats object lives in a context variable for the duration of a
+request. Every database connection gets an execute wrapper and
+Template.render is wrapped once, and both add their time to the current
+stats, if any. Outside a profiled request they cost one context variable
+lookup.
+"""
+import os
+import re
+import time
+from contextvars import ContextVar
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+from django.utils import timezone
+
+current_stats = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'db_time', 'template_time', 'template_depth')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def add_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        # First in the list, so execute_wrapper() blocks that pop the last entry leave it alone
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def timed_render(render):
+    def wrapper(self, context):
+        stats = current_stats.get()
+        if stats is None:
+            return render(self, context)
+        # {% include %} and {% extends %} render nested templates; only the
+        # outermost render is counted
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - started
+    wrapper.profiling_wrapper = True
+    return wrapper
+
+
+def install():
+    """Hook query and template timing in; safe to call more than once"""
+    connection_created.connect(add_query_recorder, dispatch_uid='trading_profiling_queries')
+    for connection in connections.all(initialized_only=True):
+        add_query_recorder(None, connection)
+    if not getattr(Template.render, 'profiling_wrapper', False):
+        Template.render = timed_render(Template.render)
+
+
+def server_timing(stats, total):
+    return (
+        f'total;dur={total * 1000:.1f}, '
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+        f'tpl;dur={stats.template_time * 1000:.1f}'
+    )
+
+
+def dump_profile(profile, directory, keep, request, elapsed):
+    """Write a pstats file named after the request, then delete all but the newest `keep` dumps"""
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    path = os.path.join(directory, f'{stamp}-{request.method}-{slug[:60]}-{elapsed * 1000:.0f}ms.prof')
+    profile.dump_stats(path)
+
+    dumps = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.prof')),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in (dumps[:-keep] if keep else []):
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # another worker rotated it first
+    return path
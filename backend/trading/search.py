@@ -0,0 +1,158 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+SEARCH_FIELDS = ['item_name', 'brand', 'model', 'description', 'serial_number']
+
+FTS_TABLE = 'trading_inventory_fts'
+
+# Must stay identical to the expression indexed by migration 0011 so that
+# PostgreSQL can use the GIN index.
+PG_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(item_name, '') || ' ' || coalesce(brand, '') || ' ' || "
+    "coalesce(model, '') || ' ' || coalesce(description, '') || ' ' || coalesce(serial_number, ''))"
+)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_tokens(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+class LikeSearchBackend:
+    """The original ``icontains`` OR chain; used where no full-text index exists"""
+    name = 'like'
+    ranked = False
+
+    def search(self, queryset, query):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+    def rebuild(self):
+        return 0
+
+
+class SQLiteFTSSearchBackend:
+    """FTS5 external-content table kept in sync by triggers on trading_inventory.
+
+    Every token is matched as a prefix (``"rog"* "strix"*``) and results are
+    ranked with bm25 (lower is better). Like the PostgreSQL backend, the
+    query also matches as a plain substring of the short identifying fields
+    (e.g. "6600" in "DUAL-RX6600-8G"); those rows rank after every FTS match.
+    """
+    name = 'sqlite_fts5'
+    ranked = True
+    substring_fields = ['model', 'serial_number']
+
+    def match_expression(self, query):
+        return ' '.join(f'"{token}"*' for token in search_tokens(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.annotate(search_rank=Value(0)).none()
+        table = queryset.model._meta.db_table
+        if connection.Database.sqlite_version_info < (3, 35):
+            # No MATERIALIZED CTEs: FTS matches only, through a join that
+            # evaluates the MATCH once
+            return queryset.extra(
+                tables=[FTS_TABLE],
+                where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+                params=[match],
+                select={'search_rank': f'{FTS_TABLE}.rank'},
+            )
+        substring = Q()
+        for field in self.substring_fields:
+            substring |= Q(**{f'{field}__icontains': query})
+        # MATCH can't be ORed with other conditions, so the FTS rows come from
+        # a subquery. The rank is looked up in a materialized CTE, which is
+        # evaluated once; a plain correlated bm25() lookup would re-run the
+        # MATCH for every row and take seconds on a large catalog.
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f'COALESCE((WITH matches AS MATERIALIZED '
+                f'(SELECT rowid AS id, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) '
+                f'SELECT rank FROM matches WHERE matches.id = {table}.id), 0)',
+                [match],
+            ),
+        ).filter(
+            Q(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])) | substring
+        )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            return cursor.fetchone()[0]
+
+
+class PostgresSearchBackend:
+    """tsvector prefix search ranked with ts_rank, plus pg_trgm-indexed
+    substring matches on the short identifying fields (e.g. "6600" in
+    "DUAL-RX6600-8G-V3")."""
+    name = 'postgres'
+    ranked = True
+    substring_fields = ['item_name', 'brand', 'model', 'serial_number']
+
+    def tsquery(self, query):
+        return ' & '.join(f'{token}:*' for token in search_tokens(query))
+
+    def search(self, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset.annotate(search_rank=Value(0)).none()
+        substring = Q()
+        for field in self.substring_fields:
+            substring |= Q(**{f'{field}__icontains': query})
+        return queryset.annotate(
+            search_rank=RawSQL(f"-ts_rank({PG_SEARCH_VECTOR}, to_tsquery('simple', %s))", [tsquery]),
+        ).filter(
+            Q(id__in=RawSQL(
+                f"SELECT id FROM {queryset.model._meta.db_table} "
+                f"WHERE {PG_SEARCH_VECTOR} @@ to_tsquery('simple', %s)",
+                [tsquery],
+            )) | substring
+        )
+
+    def rebuild(self):
+        # GIN indexes are maintained by PostgreSQL itself; REINDEX compacts them
+        table = 'trading_inventory'
+        with connection.cursor() as cursor:
+            cursor.execute(f'REINDEX TABLE {table}')
+            cursor.execute(f'SELECT count(*) FROM {table}')
+            return cursor.fetchone()[0]
+
+
+_fts_available = {}
+
+
+def sqlite_fts_available():
+    """Whether migration 0011 could create the FTS5 table (cached per database file)"""
+    name = str(connection.settings_dict['NAME'])
+    if name not in _fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_available[name] = cursor.fetchone() is not None
+    return _fts_available[name]
+
+
+def get_search_backend():
+    """Pick the backend from settings.INVENTORY_SEARCH_BACKEND or the database vendor"""
+    configured = getattr(settings, 'INVENTORY_SEARCH_BACKEND', None)
+    if configured:
+        return import_string(configured)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite' and sqlite_fts_available():
+        return SQLiteFTSSearchBackend()
+    return LikeSearchBackend()
+
+
+def search_inventory(queryset, query):
+    return get_search_backend().search(queryset, query)
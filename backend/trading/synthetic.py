@@ -0,0 +1,251 @@
+"""Seeded, deterministic generator for production-sized datasets.
+
+Rows are written with batched bulk_create, so none of the save() side
+effects run (stock adjustments, rollup deltas, summary deltas); run() rebuilds
+the daily rollups, the sales facts, the stock checkpoints and the inventory
+summary at the end instead. New items get an opening stock movement dated
+when they were added; generated sales and purchases leave stock alone, so
+they record none. The same seed against the same starting database on the
+same day produces the same rows.
+
+Timestamps follow a shop's rhythm rather than all landing on "now":
+weekends are busier, volume grows over the date range, and sales and
+purchases cluster around lunch and early evening during opening hours.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from .analytics import rebuild_sales_facts
+from .ledger import rebuild_checkpoints
+from .models import (
+    BuyItem, CacheVersion, DailyPurchaseRollup, DailySalesRollup, Inventory, InventorySummary, Sale, StockMovement,
+    TimeLog, local_day_start,
+)
+
+CATALOG = {
+    'Laptop': (['ASUS', 'Acer', 'Lenovo', 'MSI', 'HP', 'Dell'], (25000, 90000)),
+    'Monitor': (['AOC', 'ASUS', 'Samsung', 'LG', 'ViewSonic'], (5000, 30000)),
+    'SSD': (['Samsung', 'Kingston', 'WD', 'Crucial', 'Seagate'], (1200, 9000)),
+    'RAM': (['Kingston', 'Corsair', 'G.Skill', 'TeamGroup'], (1000, 8000)),
+    'GPU': (['ASUS', 'MSI', 'Gigabyte', 'Zotac', 'Sapphire'], (9000, 80000)),
+    'Motherboard': (['ASUS', 'MSI', 'Gigabyte', 'ASRock'], (4000, 25000)),
+    'Power Supply': (['Corsair', 'Seasonic', 'Cooler Master', 'Thermaltake'], (2000, 9000)),
+    'Keyboard': (['Logitech', 'Corsair', 'Razer', 'Rakk', 'Royal Kludge'], (600, 9000)),
+    'Mouse': (['Logitech', 'Razer', 'Rakk', 'SteelSeries'], (300, 6000)),
+    'Headset': (['SteelSeries', 'HyperX', 'Razer', 'Logitech'], (800, 12000)),
+    'Router': (['TP-Link', 'ASUS', 'Tenda', 'Mercusys'], (900, 15000)),
+    'Printer': (['Epson', 'Canon', 'Brother', 'HP'], (4000, 20000)),
+}
+SUPPLIERS = ['Octagon Distribution', 'MSI-ECS Philippines', 'Silicon Valley Trading', 'Dynaquest', 'PCHub Wholesale']
+PAYMENT_METHODS = ['Cash', 'Cash', 'Cash', 'GCash', 'Card', 'Bank Transfer']
+
+# Relative traffic per opening hour (9:00-20:00) and per weekday (Monday first)
+HOUR_WEIGHTS = {9: 2, 10: 4, 11: 6, 12: 9, 13: 8, 14: 6, 15: 6, 16: 7, 17: 9, 18: 10, 19: 7, 20: 3}
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 0.9, 1.1, 1.5, 1.4]
+SAMPLE_USER_PREFIX = 'sample_user_'
+SAMPLE_SERIAL_PREFIX = 'SYN-'
+
+
+def cumulative(weights):
+    total, cum = 0, []
+    for weight in weights:
+        total += weight
+        cum.append(total)
+    return cum
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the timestamps set on the objects instead of
+    auto_now/auto_now_add overwriting them with the current time"""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    try:
+        for field in fields:
+            field.auto_now = field.auto_now_add = False
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class SyntheticDataGenerator:
+    def __init__(self, seed=1, days=365, users=10, batch_size=5000, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.user_count = max(users, 1)
+        self.log = log or (lambda message: None)
+
+        # Whole days up to yesterday, so no generated timestamp lies in the future
+        today = timezone.localdate()
+        self.day_starts = [local_day_start(today - timedelta(days=offset)) for offset in range(max(days, 1), 0, -1)]
+        # Weekday pattern times a gentle growth trend across the range
+        self.day_cum = cumulative(
+            WEEKDAY_WEIGHTS[start.weekday()] * (1 + index / len(self.day_starts))
+            for index, start in enumerate(self.day_starts)
+        )
+        self.hours = list(HOUR_WEIGHTS)
+        self.hour_cum = cumulative(HOUR_WEIGHTS.values())
+
+    def timestamps(self, count):
+        days = self.rng.choices(self.day_starts, cum_weights=self.day_cum, k=count)
+        hours = self.rng.choices(self.hours, cum_weights=self.hour_cum, k=count)
+        return [day + timedelta(hours=hour, seconds=self.rng.randrange(3600)) for day, hour in zip(days, hours)]
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - start)
+
+    def run(self, items=0, sales=0, purchases=0, time_logs=0):
+        users = self.ensure_users()
+        if items:
+            self.create_items(items)
+        if sales or purchases:
+            catalog = list(Inventory.objects.order_by('id').values_list('id', 'unit_cost', 'srp_price', 'discount_price'))
+            if not catalog:
+                raise ValueError('Sales and purchases need inventory items; pass --items as well')
+            # A few best sellers and a long tail, like a real catalog
+            item_cum = cumulative(1 / (rank + 1) ** 0.8 for rank in range(len(catalog)))
+            self.rng.shuffle(catalog)
+            if sales:
+                self.create_sales(sales, users, catalog, item_cum)
+            if purchases:
+                self.create_purchases(purchases, users, catalog, item_cum)
+        if time_logs:
+            self.create_time_logs(time_logs, users)
+
+        self.log('Rebuilding daily rollups, sales facts, stock checkpoints and the inventory summary...')
+        DailySalesRollup.rebuild()
+        DailyPurchaseRollup.rebuild()
+        rebuild_sales_facts()
+        rebuild_checkpoints()
+        InventorySummary.rebuild()
+        CacheVersion.bump(CacheVersion.INVENTORY_GRID)
+        CacheVersion.bump(CacheVersion.INVENTORY_CATALOG)
+
+    def ensure_users(self):
+        usernames = [f'{SAMPLE_USER_PREFIX}{index:03d}' for index in range(1, self.user_count + 1)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        # One hash for everyone; hashing per user would dominate small runs
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(username=username, first_name='Sample', last_name=username[-3:], password=password)
+            for username in usernames if username not in existing
+        ])
+        return list(User.objects.filter(username__in=usernames).order_by('id').values_list('id', flat=True))
+
+    def create_items(self, total):
+        offset = Inventory.objects.filter(serial_number__startswith=SAMPLE_SERIAL_PREFIX).count()
+        categories = list(CATALOG)
+        fields = [
+            Inventory._meta.get_field('date_added'),
+            Inventory._meta.get_field('last_updated'),
+            StockMovement._meta.get_field('created_at'),
+        ]
+        number = offset
+        with explicit_timestamps(*fields):
+            for size in self.batches(total):
+                added = self.timestamps(size)
+                items = []
+                for date_added in added:
+                    number += 1
+                    category = self.rng.choice(categories)
+                    brands, (low, high) = CATALOG[category]
+                    brand = self.rng.choice(brands)
+                    unit_cost = Decimal(self.rng.randrange(low, high, 50))
+                    srp_price = (unit_cost * Decimal(self.rng.choice(['1.15', '1.2', '1.25', '1.35']))).quantize(Decimal('1'))
+                    items.append(Inventory(
+                        item_name=f'{brand} {category} {number:06d}',
+                        brand=brand,
+                        model=f'{brand[:3].upper()}-{self.rng.randrange(100, 9999)}',
+                        description=f'{brand} {category.lower()}',
+                        unit_cost=unit_cost,
+                        srp_price=srp_price,
+                        discount_price=srp_price - 100 if self.rng.random() < 0.1 else None,
+                        quantity=self.rng.choice([0, 1, 3, 5, 8, 12, 20, 35, 50]),
+                        serial_number=f'{SAMPLE_SERIAL_PREFIX}{number:07d}',
+                        date_added=date_added,
+                        last_updated=date_added,
+                    ))
+                Inventory.objects.bulk_create(items)
+                StockMovement.objects.bulk_create([
+                    StockMovement(
+                        item_id=item.pk,
+                        reason=StockMovement.OPENING,
+                        quantity_change=item.quantity,
+                        unit_cost=item.unit_cost,
+                        reference='Synthetic data',
+                        created_at=item.date_added,
+                    )
+                    for item in items if item.quantity
+                ])
+                self.log(f'  inventory: {number - offset}/{total}')
+
+    def create_sales(self, total, users, catalog, item_cum):
+        done = 0
+        with explicit_timestamps(Sale._meta.get_field('sale_date')):
+            for size in self.batches(total):
+                picks = self.rng.choices(catalog, cum_weights=item_cum, k=size)
+                rows = []
+                for (item_id, unit_cost, srp_price, discount_price), sale_date in zip(picks, self.timestamps(size)):
+                    quantity = self.rng.choice((1, 1, 1, 1, 1, 2, 2, 3))
+                    unit_price = discount_price or srp_price
+                    rows.append(Sale(
+                        cashier_id=self.rng.choice(users),
+                        item_id=item_id,
+                        quantity_sold=quantity,
+                        unit_price=unit_price,
+                        total_amount=unit_price * quantity,
+                        unit_cost=unit_cost,
+                        sale_date=sale_date,
+                        payment_method=self.rng.choice(PAYMENT_METHODS),
+                    ))
+                with transaction.atomic():
+                    Sale.objects.bulk_create(rows)
+                done += size
+                self.log(f'  sales: {done}/{total}')
+
+    def create_purchases(self, total, users, catalog, item_cum):
+        done = 0
+        with explicit_timestamps(BuyItem._meta.get_field('purchase_date')):
+            for size in self.batches(total):
+                picks = self.rng.choices(catalog, cum_weights=item_cum, k=size)
+                rows = []
+                for (item_id, unit_cost, _, _), purchase_date in zip(picks, self.timestamps(size)):
+                    quantity = self.rng.choice((1, 2, 5, 10, 10, 20))
+                    rows.append(BuyItem(
+                        buyer_id=self.rng.choice(users),
+                        item_id=item_id,
+                        quantity_bought=quantity,
+                        unit_cost=unit_cost,
+                        total_cost=unit_cost * quantity,
+                        supplier=self.rng.choice(SUPPLIERS),
+                        purchase_date=purchase_date,
+                    ))
+                with transaction.atomic():
+                    BuyItem.objects.bulk_create(rows)
+                done += size
+                self.log(f'  purchases: {done}/{total}')
+
+    def create_time_logs(self, total, users):
+        done = 0
+        with explicit_timestamps(TimeLog._meta.get_field('time_in')):
+            for size in self.batches(total):
+                days = self.rng.choices(self.day_starts, cum_weights=self.day_cum, k=size)
+                rows = []
+                for day in days:
+                    time_in = day + timedelta(hours=8, minutes=self.rng.randrange(0, 90))
+                    rows.append(TimeLog(
+                        user_id=self.rng.choice(users),
+                        time_in=time_in,
+                        time_out=time_in + timedelta(hours=8, minutes=self.rng.randrange(0, 120)),
+                        is_active=False,
+                    ))
+                with transaction.atomic():
+                    TimeLog.objects.bulk_create(rows)
+                done += size
+                self.log(f'  time logs: {done}/{total}')
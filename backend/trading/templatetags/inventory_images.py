@@ -0,0 +1,10 @@
+from django import template
+from ..thumbnails import thumbnail_url as build_thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(field_file, size='card', fmt='webp'):
+    """{% thumbnail_url item.item_picture 'card' 'webp' %}"""
+    return build_thumbnail_url(field_file, size, fmt)
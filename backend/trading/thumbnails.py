@@ -0,0 +1,90 @@
+from io import BytesIO
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = 'thumbnails'
+
+# Bounding boxes at roughly 2x the CSS size they are shown at
+THUMBNAIL_SIZES = {
+    'admin': (100, 100),
+    'card': (480, 400),
+}
+
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+THUMBNAIL_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def thumbnail_name(source_name, size, fmt):
+    """thumbnails/<size>/<full source path>.<fmt>
+
+    The source extension is kept, so items/a.jpg and items/a.png get
+    different thumbnails. A picture saved under a name used before is
+    caught by Inventory.save, which regenerates its thumbnails.
+    """
+    return f'{THUMBNAIL_DIR}/{size}/{source_name}.{fmt}'
+
+
+def open_source(field_file):
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        image.load()
+    finally:
+        field_file.close()
+    # Phone photos are often stored sideways with an EXIF rotation flag
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_thumbnails(field_file, force=False):
+    """Write every size/format variant of an uploaded picture; returns how many were written"""
+    storage = field_file.storage
+    missing = [
+        (size, fmt)
+        for size in THUMBNAIL_SIZES
+        for fmt in THUMBNAIL_FORMATS
+        if force or not storage.exists(thumbnail_name(field_file.name, size, fmt))
+    ]
+    if not missing:
+        return 0
+
+    source = open_source(field_file)
+    written = 0
+    for size, fmt in missing:
+        image = source.copy()
+        image.thumbnail(THUMBNAIL_SIZES[size], Image.LANCZOS)
+        pil_format, options = THUMBNAIL_FORMATS[fmt]
+        buffer = BytesIO()
+        image.save(buffer, pil_format, **options)
+        name = thumbnail_name(field_file.name, size, fmt)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(buffer.getvalue()))
+        written += 1
+    return written
+
+
+def thumbnail_url(field_file, size='card', fmt='webp'):
+    """URL of a thumbnail, generating it on first use.
+
+    Falls back to the original upload when the picture cannot be decoded.
+    """
+    if not field_file:
+        return ''
+    name = thumbnail_name(field_file.name, size, fmt)
+    storage = field_file.storage
+    if not storage.exists(name):
+        try:
+            generate_thumbnails(field_file)
+        except THUMBNAIL_ERRORS:
+            return field_file.url
+    return storage.url(name)
@@ -0,0 +1,134 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from .models import CacheVersion, Inventory
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+RESULT_FIELDS = ('id', 'item_name', 'brand', 'model', 'srp_price', 'discount_price', 'quantity')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class PrefixIndex:
+    """Sorted (token, position) pairs over item name, brand, model and serial number.
+
+    A prefix lookup is a bisect into the sorted token list; ``position`` is
+    the item's place in name order, so the best matches are simply the
+    smallest positions.
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.item_ids = []
+        self.names = []
+        entries = []
+        for position, (item_id, item_name, brand, model, serial_number) in enumerate(rows):
+            self.item_ids.append(item_id)
+            self.names.append((item_name or '').lower())
+            tokens = set(tokenize(item_name)) | set(tokenize(brand)) | set(tokenize(model)) | set(tokenize(serial_number))
+            # Whole serial/model values too, so "asus-rog-0" style input matches
+            for value in (model, serial_number):
+                if value:
+                    tokens.add(value.lower())
+            entries.extend((token, position) for token in tokens)
+        entries.sort()
+        self.tokens = [token for token, _ in entries]
+        self.positions = [position for _, position in entries]
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def prefix_positions(self, prefix):
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_left(self.tokens, prefix + '\uffff', lo=start)
+        return set(self.positions[start:end])
+
+    def lookup(self, query, batch_size):
+        """Item ids of every match, best first, in lists that double in size.
+
+        The first list is picked with a heap; the remaining matches are only
+        sorted when the caller keeps iterating.
+        """
+        words = tokenize(query)
+        if not words:
+            return
+        # Longer words usually match fewer tokens, so intersect from there
+        words.sort(key=len, reverse=True)
+        matches = self.prefix_positions(words[0])
+        for word in words[1:]:
+            if not matches:
+                break
+            matches &= self.prefix_positions(word)
+        if not matches:
+            return
+
+        query_text = ' '.join(tokenize(query))
+
+        def rank(position):
+            return (not self.names[position].startswith(query_text), position)
+
+        yield [self.item_ids[position] for position in heapq.nsmallest(batch_size, matches, key=rank)]
+        if len(matches) <= batch_size:
+            return
+        ordered = sorted(matches, key=rank)
+        start = batch_size
+        while start < len(ordered):
+            batch_size *= 2
+            yield [self.item_ids[position] for position in ordered[start:start + batch_size]]
+            start += batch_size
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return this process's index, rebuilding it when the catalog version moved on"""
+    global _index
+    version = CacheVersion.get(CacheVersion.INVENTORY_CATALOG)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        if _index is None or _index.version != version:
+            rows = Inventory.objects.order_by('item_name', 'id').values_list(
+                'id', 'item_name', 'brand', 'model', 'serial_number'
+            ).iterator(chunk_size=5000)
+            _index = PrefixIndex(version, rows)
+        return _index
+
+
+def suggest(query, limit=10, in_stock_only=True):
+    """Top matching items with only the fields the cashier UI needs.
+
+    Stock and prices change far more often than names, so they are read
+    fresh for each batch of candidates instead of living in the index.
+    """
+    results = []
+    # Out-of-stock and deleted items are skipped, so keep reading matches
+    # until there are enough rows or none are left
+    for candidate_ids in get_index().lookup(query, limit * 3 if in_stock_only else limit):
+        items = Inventory.objects.filter(id__in=candidate_ids)
+        if in_stock_only:
+            items = items.filter(quantity__gt=0)
+        rows = {row['id']: row for row in items.values(*RESULT_FIELDS)}
+        for item_id in candidate_ids:
+            row = rows.get(item_id)
+            if row is None:
+                continue
+            results.append({
+                'id': row['id'],
+                'item_name': row['item_name'],
+                'brand': row['brand'],
+                'model': row['model'],
+                'srp_price': float(row['srp_price']),
+                'discount_price': float(row['discount_price']) if row['discount_price'] else None,
+                'quantity': row['quantity'],
+            })
+            if len(results) == limit:
+                return results
+    return results
@@ -1,20 +1,142 @@
 from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse, QueryDict
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from .models import Inventory, TimeLog, Sale, BuyItem
+from .activity import count_visit
+from .analytics import DIMENSIONS, ORDERINGS, cached_sales_cube
+from .batch_update import BatchUpdateError, apply_patches, parse_patches
+from .checkout import CheckoutError, InsufficientStock, checkout, parse_lines, parse_sale_fields
+from .importer import run_import_job_inline
+from .pagination import estimated_count, paginate_keyset
+from .payroll import EXPORT_HEADER, PERIODS, default_range, export_rows, payroll_hours, write_workbook
+from .search import get_search_backend
+from .typeahead import suggest
+from .models import CacheVersion, ImportJob, Inventory, InventorySummary, RefreshWatermark, ReorderForecast, StockMovement, TimeLog, Sale, BuyItem, DailySalesRollup, DailyPurchaseRollup, day_range_lookup
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 import json
 import csv
-import io
+import hashlib
 from decimal import Decimal
 from datetime import datetime
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Max, Q
+
+EXPORT_CHUNK_SIZE = 2000
+DASHBOARD_PAGE_SIZE = 12
+CASHIER_PAGE_SIZE = 20
+REORDER_PAGE_SIZE = 50
+
+class Echo:
+    """File-like object whose write() hands the row straight back to csv.writer"""
+    def write(self, value):
+        return value
+
+def stream_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def parse_filter_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def history_day_range(request):
+    """(first, last) local day selected by the date and date_from/date_to filters; None when open"""
+    starts = [day for day in (parse_filter_date(request.GET.get('date')), parse_filter_date(request.GET.get('date_from'))) if day]
+    ends = [day for day in (parse_filter_date(request.GET.get('date')), parse_filter_date(request.GET.get('date_to'))) if day]
+    return (max(starts) if starts else None), (min(ends) if ends else None)
+
+def filter_history(request, queryset, date_field, user_field, user_param):
+    """Apply the history page filters (date, user, date_from/date_to) to a queryset"""
+    start_date, end_date = history_day_range(request)
+    queryset = queryset.filter(**day_range_lookup(date_field, start_date, end_date))
+    
+    user_filter = request.GET.get(user_param)
+    if user_filter:
+        queryset = queryset.filter(**{f'{user_field}__username__icontains': user_filter})
+    
+    return queryset
+
+def filter_history_rollups(request, rollups, user_field, user_param):
+    """filter_history for the daily rollups, whose day column is a plain date"""
+    start_date, end_date = history_day_range(request)
+    if start_date:
+        rollups = rollups.filter(day__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(day__lte=end_date)
+    
+    user_filter = request.GET.get(user_param)
+    if user_filter:
+        rollups = rollups.filter(**{f'{user_field}__username__icontains': user_filter})
+    
+    return rollups
+
+def history_filter_context(request, user_param):
+    """The history filter values for the template, plus a query string that
+    repeats them for the export and pagination links"""
+    params = QueryDict(mutable=True)
+    for name in ('date', 'date_from', 'date_to', user_param):
+        if request.GET.get(name):
+            params[name] = request.GET[name]
+    return {
+        'date_filter': request.GET.get('date'),
+        'date_from': request.GET.get('date_from'),
+        'date_to': request.GET.get('date_to'),
+        f'{user_param}_filter': request.GET.get(user_param),
+        'filter_query': params.urlencode(),
+    }
+
+def dashboard_grid_key(version, *params):
+    raw = json.dumps([version, *params])
+    return 'trading:dashboard-grid:' + hashlib.md5(raw.encode()).hexdigest()
+
+def dashboard_queryset(search_backend, search_query, sort_by, sort_order, explicit_sort):
+    inventory_items = Inventory.objects.select_related('forecast')
+    
+    if search_query:
+        inventory_items = search_backend.search(inventory_items, search_query)
+    
+    ordering = f'-{sort_by}' if sort_order == 'desc' else sort_by
+    if search_query and search_backend.ranked and not explicit_sort:
+        return inventory_items.order_by('search_rank', ordering)
+    return inventory_items.order_by(ordering)
+
+def render_dashboard_grid(page_obj, search_query, sort_by, sort_order, stats):
+    """Render the card grid into a plain dict (HTML, the "Showing x-y of n"
+    numbers and, when searching, the header stats) that can be cached as-is"""
+    html = render_to_string('dashboard_inventory_grid.html', {
+        'page_obj': page_obj,
+        'search_query': search_query,
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+    })
+    return {
+        'html': str(html),
+        'start_index': page_obj.start_index(),
+        'end_index': page_obj.end_index(),
+        'count': page_obj.paginator.count,
+        'stats': stats,
+    }
+
+def build_dashboard_grid(search_query, sort_by, sort_order, page_number, explicit_sort):
+    """Query and render one page of the dashboard card grid"""
+    inventory_items = dashboard_queryset(get_search_backend(), search_query, sort_by, sort_order, explicit_sort)
+    paginator = Paginator(inventory_items, DASHBOARD_PAGE_SIZE)
+    page_obj = paginator.get_page(page_number)
+    stats = InventorySummary.compute(inventory_items) if search_query else None
+    return render_dashboard_grid(page_obj, search_query, sort_by, sort_order, stats)
 
 def login_view(request):
     if request.method == 'POST':
@@ -40,45 +162,41 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-    visits = request.session.get('visit_count', 0)
-    visits += 1
-    request.session['visit_count'] = visits
+    visits = count_visit(request)
     
     search_query = request.GET.get('search', '')
     sort_by = request.GET.get('sort', 'item_name')
     sort_order = request.GET.get('order', 'asc')
+    page_number = request.GET.get('page')
+    explicit_sort = 'sort' in request.GET
     
-    inventory_items = Inventory.objects.all()
+    version = CacheVersion.get(CacheVersion.INVENTORY_GRID)
+    key = dashboard_grid_key(version, search_query, sort_by, sort_order, page_number, explicit_sort)
+    grid = cache.get(key)
+    if grid is None:
+        grid = build_dashboard_grid(search_query, sort_by, sort_order, page_number, explicit_sort)
+        cache.set(key, grid, settings.DASHBOARD_GRID_CACHE_TIMEOUT)
     
     if search_query:
-        inventory_items = inventory_items.filter(
-            Q(item_name__icontains=search_query) |
-            Q(brand__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(serial_number__icontains=search_query)
-        )
-    
-    if sort_order == 'desc':
-        sort_by = f'-{sort_by}'
-    inventory_items = inventory_items.order_by(sort_by)
-    
-    paginator = Paginator(inventory_items, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    total_items = inventory_items.count()
-    total_value = sum(item.total_value for item in inventory_items)
-    low_stock_items = inventory_items.filter(quantity__lte=5).count()
-    out_of_stock_items = inventory_items.filter(quantity=0).count()
+        stats = grid['stats']
+        total_items = stats['total_items']
+        total_value = stats['total_value']
+        low_stock_items = stats['low_stock_items']
+        out_of_stock_items = stats['out_of_stock_items']
+    else:
+        summary = InventorySummary.current()
+        total_items = summary.total_items
+        total_value = summary.total_value
+        low_stock_items = summary.low_stock_items
+        out_of_stock_items = summary.out_of_stock_items
     
     current_time_log = TimeLog.objects.filter(user=request.user, is_active=True).first()
     
     context = {
         'visits': visits,
-        'page_obj': page_obj,
+        'grid': grid,
         'search_query': search_query,
-        'sort_by': sort_by.replace('-', ''),
+        'sort_by': sort_by,
         'sort_order': sort_order,
         'total_items': total_items,
         'total_value': total_value,
@@ -130,31 +248,20 @@ def buy_item(request, item_id):
 
 @login_required
 def buy_history(request):
-    buy_items = BuyItem.objects.all().order_by('-purchase_date')
+    buy_items = filter_history(request, BuyItem.objects.all(), 'purchase_date', 'buyer', 'buyer')
+    rollups = filter_history_rollups(request, DailyPurchaseRollup.objects.all(), 'buyer', 'buyer')
     
-    date_filter = request.GET.get('date')
-    if date_filter:
-        try:
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            buy_items = buy_items.filter(purchase_date__date=filter_date)
-        except ValueError:
-            pass
-    
-    buyer_filter = request.GET.get('buyer')
-    if buyer_filter:
-        buy_items = buy_items.filter(buyer__username__icontains=buyer_filter)
-    
-    paginator = Paginator(buy_items, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_keyset(
+        buy_items.order_by('-purchase_date').select_related('buyer', 'item'), request.GET.get('cursor'), 'purchase_date',
+    )
     
-    total_purchases = buy_items.count()
-    total_cost = sum(buy_item.total_cost for buy_item in buy_items)
+    totals = DailyPurchaseRollup.totals(rollups)
+    total_purchases = totals['transaction_count']
+    total_cost = totals['amount']
     
     context = {
         'page_obj': page_obj,
-        'date_filter': date_filter,
-        'buyer_filter': buyer_filter,
+        **history_filter_context(request, 'buyer'),
         'total_purchases': total_purchases,
         'total_cost': total_cost,
         'session_timeout': settings.SESSION_TIMEOUT,
@@ -164,41 +271,45 @@ def buy_history(request):
 
 @login_required
 def export_buy_history_csv(request):
-    response = HttpResponse(content_type='text/csv')
+    buy_items = filter_history(request, BuyItem.objects.all(), 'purchase_date', 'buyer', 'buyer')
+    rows = buy_items.order_by('-purchase_date').values_list(
+        'purchase_date', 'buyer__username', 'item__item_name',
+        'quantity_bought', 'unit_cost', 'total_cost', 'supplier'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    def format_rows():
+        for purchase_date, buyer, item_name, quantity_bought, unit_cost, total_cost, supplier in rows:
+            yield [
+                purchase_date.strftime('%Y-%m-%d %H:%M'),
+                buyer,
+                item_name,
+                quantity_bought,
+                float(unit_cost),
+                float(total_cost),
+                supplier
+            ]
+    
+    header = ['Date', 'Buyer', 'Item', 'Quantity Bought', 'Unit Cost', 'Total Cost', 'Supplier']
+    response = StreamingHttpResponse(stream_csv(header, format_rows()), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="js_it_buy_history_{timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Buyer', 'Item', 'Quantity Bought', 'Unit Cost', 'Total Cost', 'Supplier'])
-    
-    buy_items = BuyItem.objects.all().order_by('-purchase_date')
-    
-    for buy_item in buy_items:
-        writer.writerow([
-            buy_item.purchase_date.strftime('%Y-%m-%d %H:%M'),
-            buy_item.buyer.username,
-            buy_item.item.item_name,
-            buy_item.quantity_bought,
-            float(buy_item.unit_cost),
-            float(buy_item.total_cost),
-            buy_item.supplier
-        ])
-    
     return response
 
-@login_required
-def cashier(request):
-    search_query = request.GET.get('search', '')
+def cashier_queryset(search_query):
     inventory_items = Inventory.objects.filter(quantity__gt=0)
     
     if search_query:
-        inventory_items = inventory_items.filter(
-            Q(item_name__icontains=search_query) |
-            Q(brand__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        search_backend = get_search_backend()
+        inventory_items = search_backend.search(inventory_items, search_query)
+        if search_backend.ranked:
+            inventory_items = inventory_items.order_by('search_rank', 'item_name')
+    return inventory_items
+
+@login_required
+def cashier(request):
+    search_query = request.GET.get('search', '')
+    inventory_items = cashier_queryset(search_query)
     
-    paginator = Paginator(inventory_items, 20)
+    paginator = Paginator(inventory_items, CASHIER_PAGE_SIZE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -210,6 +321,17 @@ def cashier(request):
     
     return render(request, 'cashier.html', context)
 
+@login_required
+def cashier_typeahead(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(int(request.GET.get('limit', 10)), 50)
+    except ValueError:
+        limit = 10
+    
+    results = suggest(query, limit=limit) if query else []
+    return JsonResponse({'success': True, 'query': query, 'results': results})
+
 @login_required
 def process_sale(request, item_id):
     item = get_object_or_404(Inventory, id=item_id)
@@ -217,9 +339,7 @@ def process_sale(request, item_id):
     if request.method == 'POST':
         try:
             quantity_sold = int(request.POST.get('quantity', 1))
-            customer_name = request.POST.get('customer_name', '')
-            payment_method = request.POST.get('payment_method', 'Cash')
-            notes = request.POST.get('notes', '')
+            fields = parse_sale_fields(request.POST.dict())
             
             if quantity_sold <= 0:
                 messages.error(request, 'Quantity must be greater than 0.')
@@ -229,21 +349,21 @@ def process_sale(request, item_id):
                 messages.error(request, f'Not enough stock. Available: {item.quantity}')
                 return redirect('cashier')
             
-            unit_price = float(request.POST.get('unit_price', item.srp_price))
+            unit_price = Decimal(str(float(request.POST.get('unit_price', item.srp_price))))
             
-            sale = Sale.objects.create(
-                cashier=request.user,
-                item=item,
-                quantity_sold=quantity_sold,
-                unit_price=unit_price,
-                customer_name=customer_name,
-                payment_method=payment_method,
-                notes=notes
+            sale, = checkout(
+                request.user,
+                [(item.id, quantity_sold, unit_price)],
+                **fields
             )
             
             messages.success(request, f'Sale processed successfully! {quantity_sold} units of {item.item_name} sold for ₱{sale.total_amount:,.2f}')
             return redirect('cashier')
             
+        except InsufficientStock as e:
+            available = e.shortages[0]['available'] if e.shortages else item.quantity
+            messages.error(request, f'Not enough stock. Available: {available}')
+            return redirect('cashier')
         except Exception as e:
             messages.error(request, f'Error processing sale: {str(e)}')
     
@@ -255,32 +375,51 @@ def process_sale(request, item_id):
     return render(request, 'process_sale.html', context)
 
 @login_required
-def sales_history(request):
-    sales = Sale.objects.all().order_by('-sale_date')
+def checkout_cart(request):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request'}, status=400)
     
-    date_filter = request.GET.get('date')
-    if date_filter:
-        try:
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            sales = sales.filter(sale_date__date=filter_date)
-        except ValueError:
-            pass
-    
-    cashier_filter = request.GET.get('cashier')
-    if cashier_filter:
-        sales = sales.filter(cashier__username__icontains=cashier_filter)
-    
-    paginator = Paginator(sales, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    try:
+        data = json.loads(request.body)
+        fields = parse_sale_fields(data)
+        lines = parse_lines(data.get('lines'))
+        sales = checkout(request.user, lines, **fields)
+    except InsufficientStock as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e),
+            'shortages': e.shortages,
+        }, status=409)
+    except (CheckoutError, ValueError, AttributeError) as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    
+    total_amount = sum(sale.total_amount for sale in sales)
+    return JsonResponse({
+        'success': True,
+        'message': f'Checkout complete! {len(sales)} line(s) sold for ₱{total_amount:,.2f}',
+        'sale_ids': [sale.id for sale in sales],
+        'total_amount': float(total_amount),
+    })
+
+def sales_history_querysets(request):
+    """Sales and their daily rollups narrowed by the history filters, plus the filter context"""
+    sales = filter_history(request, Sale.objects.all(), 'sale_date', 'cashier', 'cashier')
+    rollups = filter_history_rollups(request, DailySalesRollup.objects.all(), 'cashier', 'cashier')
+    sales = sales.order_by('-sale_date').select_related('cashier', 'item')
+    return sales, rollups, history_filter_context(request, 'cashier')
+
+@login_required
+def sales_history(request):
+    sales, rollups, filters = sales_history_querysets(request)
+    page_obj = paginate_keyset(sales, request.GET.get('cursor'), 'sale_date')
     
-    total_sales = sales.count()
-    total_revenue = sum(sale.total_amount for sale in sales)
+    totals = DailySalesRollup.totals(rollups)
+    total_sales = totals['transaction_count']
+    total_revenue = totals['amount']
     
     context = {
         'page_obj': page_obj,
-        'date_filter': date_filter,
-        'cashier_filter': cashier_filter,
+        **filters,
         'total_sales': total_sales,
         'total_revenue': total_revenue,
         'session_timeout': settings.SESSION_TIMEOUT,
@@ -290,26 +429,28 @@ def sales_history(request):
 
 @login_required
 def export_sales_csv(request):
-    response = HttpResponse(content_type='text/csv')
+    sales = filter_history(request, Sale.objects.all(), 'sale_date', 'cashier', 'cashier')
+    rows = sales.order_by('-sale_date').values_list(
+        'sale_date', 'cashier__username', 'item__item_name', 'quantity_sold',
+        'unit_price', 'total_amount', 'customer_name', 'payment_method'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    def format_rows():
+        for sale_date, cashier_name, item_name, quantity_sold, unit_price, total_amount, customer_name, payment_method in rows:
+            yield [
+                sale_date.strftime('%Y-%m-%d %H:%M'),
+                cashier_name,
+                item_name,
+                quantity_sold,
+                float(unit_price),
+                float(total_amount),
+                customer_name,
+                payment_method
+            ]
+    
+    header = ['Date', 'Cashier', 'Item', 'Quantity Sold', 'Unit Price', 'Total Amount', 'Customer', 'Payment Method']
+    response = StreamingHttpResponse(stream_csv(header, format_rows()), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="js_it_sales_{timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Cashier', 'Item', 'Quantity Sold', 'Unit Price', 'Total Amount', 'Customer', 'Payment Method'])
-    
-    sales = Sale.objects.all().order_by('-sale_date')
-    
-    for sale in sales:
-        writer.writerow([
-            sale.sale_date.strftime('%Y-%m-%d %H:%M'),
-            sale.cashier.username,
-            sale.item.item_name,
-            sale.quantity_sold,
-            float(sale.unit_price),
-            float(sale.total_amount),
-            sale.customer_name,
-            sale.payment_method
-        ])
-    
     return response
 
 @login_required
@@ -346,8 +487,7 @@ def time_out(request):
     
     return redirect('dashboard')
 
-@login_required
-def time_logs(request):
+def time_logs_queryset(request):
     time_logs = TimeLog.objects.all().order_by('-time_in')
     
     user_filter = request.GET.get('user')
@@ -358,26 +498,200 @@ def time_logs(request):
     if date_filter:
         try:
             filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            time_logs = time_logs.filter(time_in__date=filter_date)
+            time_logs = time_logs.filter(**day_range_lookup('time_in', filter_date, filter_date))
         except ValueError:
             pass
     
-    paginator = Paginator(time_logs, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return time_logs, user_filter, date_filter
+
+def time_log_users():
+    return get_user_model().objects.filter(timelog__isnull=False).distinct()
+
+@login_required
+def time_logs(request):
+    time_logs, user_filter, date_filter = time_logs_queryset(request)
+    page_obj = paginate_keyset(time_logs.select_related('user'), request.GET.get('cursor'), 'time_in')
+    
+    # Counting every matching log is the expensive part on a long history,
+    # so the exact total is only computed on request
+    show_count = request.GET.get('count') == '1'
+    if show_count:
+        page_obj.total_count = time_logs.count()
+    else:
+        page_obj.total_count = estimated_count(time_logs)
     
-    users = get_user_model().objects.filter(timelog__isnull=False).distinct()
+    users = time_log_users()
     
     context = {
         'page_obj': page_obj,
         'users': users,
         'user_filter': user_filter,
         'date_filter': date_filter,
+        'show_count': show_count,
         'session_timeout': settings.SESSION_TIMEOUT,
     }
     
     return render(request, 'time_logs.html', context)
 
+@login_required
+def payroll_report(request):
+    default_start, default_end = default_range()
+    start_date = parse_filter_date(request.GET.get('start')) or default_start
+    end_date = parse_filter_date(request.GET.get('end')) or default_end
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    period = request.GET.get('period')
+    if period not in PERIODS:
+        period = 'pay_period'
+    user_filter = request.GET.get('user', '')
+    
+    rows = payroll_hours(start_date, end_date, period, [user_filter] if user_filter else None)
+    
+    export_format = request.GET.get('format')
+    filename = f"js_it_payroll_{period}_{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+    if export_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(EXPORT_HEADER, export_rows(rows)), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+    if export_format == 'xlsx':
+        return FileResponse(
+            write_workbook(rows),
+            as_attachment=True,
+            filename=f'{filename}.xlsx',
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    
+    context = {
+        'rows': rows,
+        'total_hours': sum((row['hours'] for row in rows), Decimal('0.00')),
+        'open_sessions': sum(row['open_sessions'] for row in rows),
+        'start_date': start_date,
+        'end_date': end_date,
+        'period': period,
+        'periods': [('day', 'Day'), ('week', 'Week'), ('pay_period', 'Pay Period')],
+        'user_filter': user_filter,
+        'users': time_log_users(),
+        'export_query': request.GET.urlencode(),
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    
+    return render(request, 'payroll_report.html', context)
+
+@login_required
+def sales_analytics(request):
+    # SalesFact is kept up to date by the refresh_sales_facts command; folding
+    # sales in here would make this read-only page take the write lock
+    today = timezone.localdate()
+    start_date = parse_filter_date(request.GET.get('start')) or today.replace(day=1)
+    end_date = parse_filter_date(request.GET.get('end')) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    group_by = [dimension for dimension in request.GET.getlist('group_by') if dimension in DIMENSIONS][:3] or ['brand']
+    order = request.GET.get('order') if request.GET.get('order') in ORDERINGS else 'revenue'
+    try:
+        limit = min(max(int(request.GET.get('limit', 50)), 1), 500)
+    except ValueError:
+        limit = 50
+    filters = {
+        'brand': request.GET.get('brand', '').strip(),
+        'cashier': request.GET.get('cashier', '').strip(),
+        'payment_method': request.GET.get('payment_method', '').strip(),
+        'item': request.GET.get('item', '').strip(),
+    }
+    
+    rows, totals = cached_sales_cube(
+        start_date=start_date, end_date=end_date, group_by=group_by, order=order, limit=limit, **filters,
+    )
+    facts_updated_at = RefreshWatermark.objects.filter(key=RefreshWatermark.SALES_FACTS).values_list(
+        'updated_at', flat=True
+    ).first()
+    
+    context = {
+        'rows': rows,
+        'totals': totals,
+        'start_date': start_date,
+        'end_date': end_date,
+        'group_by': group_by,
+        'group_labels': [DIMENSIONS[dimension][0] for dimension in group_by],
+        'dimensions': [(name, label) for name, (label, _) in DIMENSIONS.items()],
+        'order': order,
+        'orderings': [('revenue', 'Revenue'), ('units', 'Units'), ('margin', 'Margin'), ('transactions', 'Transactions')],
+        'limit': limit,
+        'filters': filters,
+        'users': get_user_model().objects.order_by('username'),
+        'facts_updated_at': facts_updated_at,
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    
+    return render(request, 'sales_analytics.html', context)
+
+def reorder_queryset(request):
+    """Forecasts filtered by the reorder report's status and search; 'order' (the default) is everything to buy"""
+    status = request.GET.get('status', 'order')
+    forecasts = ReorderForecast.objects.select_related('item')
+    if status == 'order':
+        forecasts = forecasts.filter(status__in=[ReorderForecast.OUT_OF_STOCK, ReorderForecast.REORDER])
+    elif status in dict(ReorderForecast.STATUSES):
+        forecasts = forecasts.filter(status=status)
+    else:
+        status = 'all'
+    
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        forecasts = forecasts.filter(
+            Q(item__item_name__icontains=search_query) | Q(item__brand__icontains=search_query) | Q(item__model__icontains=search_query)
+        )
+    # Soonest to run out first
+    return forecasts.order_by(F('days_of_cover').asc(nulls_last=True), '-velocity', 'item__item_name'), status, search_query
+
+@login_required
+def reorder_report(request):
+    forecasts, status, search_query = reorder_queryset(request)
+    page_obj = Paginator(forecasts, REORDER_PAGE_SIZE).get_page(request.GET.get('page'))
+    
+    counts = dict(ReorderForecast.objects.order_by().values_list('status').annotate(count=Count('id')))
+    context = {
+        'page_obj': page_obj,
+        'status': status,
+        'search_query': search_query,
+        'statuses': [(value, label, counts.get(value, 0)) for value, label in ReorderForecast.STATUSES],
+        'order_count': counts.get(ReorderForecast.OUT_OF_STOCK, 0) + counts.get(ReorderForecast.REORDER, 0),
+        'computed_at': ReorderForecast.objects.aggregate(latest=Max('computed_at'))['latest'],
+        'lead_time': settings.REORDER_LEAD_TIME_DAYS,
+        'review_days': settings.REORDER_REVIEW_DAYS,
+        'session_timeout': settings.SESSION_TIMEOUT,
+    }
+    
+    return render(request, 'reorder_report.html', context)
+
+@login_required
+def export_reorder_csv(request):
+    forecasts, _, _ = reorder_queryset(request)
+    
+    def format_rows():
+        for forecast in forecasts.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            item = forecast.item
+            yield [
+                item.brand,
+                item.model,
+                item.item_name,
+                item.quantity,
+                round(forecast.velocity, 2),
+                '' if forecast.days_of_cover is None else round(forecast.days_of_cover, 1),
+                forecast.safety_stock,
+                forecast.reorder_point,
+                forecast.suggested_quantity,
+                float(item.unit_cost),
+                float(item.unit_cost * forecast.suggested_quantity),
+                forecast.get_status_display(),
+            ]
+    
+    header = ['Brand', 'Model', 'Item', 'Quantity', 'Units per Day', 'Days of Cover', 'Safety Stock', 'Reorder Point',
+              'Suggested Order', 'Unit Cost', 'Order Cost', 'Status']
+    response = StreamingHttpResponse(stream_csv(header, format_rows()), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="js_it_reorder_{timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M%S")}.csv"'
+    return response
+
 @login_required
 def add_inventory_item(request):
     if request.method == 'POST':
@@ -443,6 +757,7 @@ def edit_inventory_item(request, item_id):
             if 'item_picture' in request.FILES:
                 item.item_picture = request.FILES['item_picture']
             
+            item.note_movement(StockMovement.ADJUSTMENT, 'Item edit', request.user.id)
             item.save()
             messages.success(request, f'Item "{item.item_name}" updated successfully!')
             return redirect('dashboard')
@@ -482,6 +797,7 @@ def update_item_ajax(request, item_id):
             if 'srp_price' in data:
                 item.srp_price = float(data['srp_price'])
             
+            item.note_movement(StockMovement.ADJUSTMENT, 'Quick edit', request.user.id)
             item.save()
             
             return JsonResponse({
@@ -499,56 +815,97 @@ def update_item_ajax(request, item_id):
     
     return JsonResponse({'success': False, 'message': 'Invalid request'}, status=400)
 
+@login_required
+def batch_update_items(request):
+    """Batch version of update_item_ajax: {"items": [{id, quantity, unit_cost, srp_price, discount_price}, ...]}.
+    
+    All patches are applied in one transaction or none are. Unlike the
+    single-item endpoint this one is CSRF protected; send the token in
+    the X-CSRFToken header.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request'}, status=400)
+    
+    try:
+        data = json.loads(request.body)
+        items = apply_patches(parse_patches(data.get('items')), request.user.id)
+    except BatchUpdateError as e:
+        return JsonResponse({'success': False, 'message': str(e), 'errors': e.errors}, status=400)
+    except (ValueError, AttributeError) as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(items)} item(s) updated successfully',
+        'items': [
+            {
+                'id': item.id,
+                'total_value': float(item.total_value),
+                'stock_status': item.stock_status,
+            }
+            for item in items
+        ],
+    })
+
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 from openpyxl.formatting.rule import FormulaRule
 from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
-from django.utils import timezone
-import io
+import tempfile
+
+XLSX_WIDTH_SAMPLE_SIZE = 1000
+
+def inventory_export_rows(queryset):
+    """Yield spreadsheet rows from (brand, model, description, item_name, quantity, srp_price, discount_price) tuples"""
+    for brand, model, description, item_name, quantity, srp_price, discount_price in queryset:
+        yield [
+            brand if brand else 'Unknown',
+            model if model else 'Unknown',
+            description if description else item_name or '',
+            quantity,
+            float(srp_price),
+            float(discount_price) if discount_price else 0.0,
+        ]
 
 @login_required
 def export_inventory_csv(request):
     # Rename still keeps the old URL; we now output .xlsx
-    inventory_items = Inventory.objects.all().order_by('brand', 'item_name')
+    inventory_items = Inventory.objects.order_by('brand', 'item_name').values_list(
+        'brand', 'model', 'description', 'item_name', 'quantity', 'srp_price', 'discount_price'
+    )
+    row_count = inventory_items.count()
 
-    # Create workbook and sheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Inventory"
+    # Write-only workbook: rows are serialized as they are appended instead of
+    # being kept as cell objects, so memory stays flat for large catalogs.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Inventory")
 
     headers = ['FOCUS', 'Model', 'Description', 'Quantity', 'SRP Price', 'DISCOUNT PRICE']
-    bold_font = Font(bold=True)
-    ws.append(headers)
-    for col_idx, _ in enumerate(headers, start=1):
-        ws.cell(row=1, column=col_idx).font = bold_font
 
-    # Track max width per column for auto-sizing
+    # Column widths must be known before the first row is written, so size
+    # them from a sample of the rows (with a bit of padding)
     max_widths = [len(h) for h in headers]
-
-    for item in inventory_items:
-        focus = item.brand if item.brand else 'Unknown'
-        model = item.model if item.model else 'Unknown'
-        description = item.description if item.description else item.item_name or ''
-        quantity = item.quantity
-        srp_price = float(item.srp_price)
-        discount_price = float(item.discount_price) if item.discount_price else 0.0
-
-        row = [focus, model, description, quantity, srp_price, discount_price]
-        ws.append(row)
-
+    for row in inventory_export_rows(inventory_items[:XLSX_WIDTH_SAMPLE_SIZE]):
         for idx, val in enumerate(row):
-            text = str(val)
-            if len(text) > max_widths[idx]:
-                max_widths[idx] = len(text)
-
-    # Adjust column widths (with a bit of padding)
+            max_widths[idx] = max(max_widths[idx], len(str(val)))
     for i, width in enumerate(max_widths, start=1):
         ws.column_dimensions[get_column_letter(i)].width = width + 5
 
+    bold_font = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = bold_font
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in inventory_export_rows(inventory_items.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+        ws.append(row)
+
     # Conditional formatting: if Quantity (column D) <= 1, make entire row font red
-    max_row = ws.max_row
+    max_row = row_count + 1
     if max_row >= 2:
         # Apply formula rule to rows 2..end over all columns A..F
         # Use a formula that locks column D but adjusts row: =$D2<=1
@@ -556,101 +913,87 @@ def export_inventory_csv(request):
         rule = FormulaRule(formula=["$D2<=1"], font=red_font)
         ws.conditional_formatting.add(f"A2:F{max_row}", rule)
 
-    # Save to in-memory bytes
-    output = io.BytesIO()
+    # Spool to a temporary file and stream it out; the file is removed when
+    # the response closes it
+    output = tempfile.TemporaryFile()
     wb.save(output)
     output.seek(0)
 
     filename = f"js_it_inventory_{timezone.localtime(timezone.now()).strftime('%Y%m%d_%H%M%S')}.xlsx"
-    response = HttpResponse(
-        output.read(),
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
 
 
 @login_required
 def import_inventory_csv(request):
+    wants_json = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    
+    def reject(message):
+        if wants_json:
+            return JsonResponse({'success': False, 'message': message}, status=400)
+        messages.error(request, message)
+        return redirect('dashboard')
+    
     if request.method == 'POST':
         if 'csv_file' not in request.FILES:
-            messages.error(request, 'Please select a CSV file to import.')
-            return redirect('dashboard')
+            return reject('Please select a CSV file to import.')
         
         csv_file = request.FILES['csv_file']
         
         if not csv_file.name.endswith('.csv'):
-            messages.error(request, 'Please upload a valid CSV file.')
-            return redirect('dashboard')
+            return reject('Please upload a valid CSV file.')
         
         try:
-            decoded_file = csv_file.read().decode('utf-8')
-            csv_data = csv.reader(io.StringIO(decoded_file))
-            
-            next(csv_data, None)
-            
-            imported_count = 0
-            updated_count = 0
-            errors = []
-            
-            for row_num, row in enumerate(csv_data, start=2):
-                try:
-                    if len(row) >= 6:
-                        focus, model, description, quantity, srp_price, discount_price = row[:6]
-                        
-                        focus = focus.strip() if focus else 'Unknown'
-                        model = model.strip() if model else 'Unknown'
-                        description = description.strip() if description else ''
-                        quantity = int(quantity) if quantity.isdigit() else 0
-                        srp_price = float(srp_price) if srp_price.replace('.', '').replace(',', '').isdigit() else 0.0
-                        discount_price = float(discount_price) if discount_price.replace('.', '').replace(',', '').isdigit() else 0.0
-                        
-                        existing_item = Inventory.objects.filter(
-                            brand__iexact=focus,
-                            model__iexact=model
-                        ).first()
-                        
-                        if existing_item:
-                            existing_item.description = description
-                            existing_item.quantity = quantity
-                            existing_item.srp_price = srp_price
-                            existing_item.discount_price = discount_price
-                            existing_item.save()
-                            updated_count += 1
-                        else:
-                            Inventory.objects.create(
-                                item_name=f"{focus} {model}",
-                                brand=focus,
-                                model=model,
-                                description=description,
-                                quantity=quantity,
-                                srp_price=srp_price,
-                                discount_price=discount_price
-                            )
-                            imported_count += 1
-                    else:
-                        errors.append(f"Row {row_num}: Insufficient columns")
-                        
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-            
-            if imported_count > 0 or updated_count > 0:
-                success_msg = f"Import completed: {imported_count} new items imported, {updated_count} items updated."
-                if errors:
-                    success_msg += f" {len(errors)} errors occurred."
-                messages.success(request, success_msg)
-            
-            if errors:
-                for error in errors[:5]:
-                    messages.warning(request, error)
-                if len(errors) > 5:
-                    messages.warning(request, f"... and {len(errors) - 5} more errors")
-            
+            job = ImportJob.objects.create(
+                user=request.user,
+                csv_file=csv_file,
+                original_name=csv_file.name,
+            )
         except Exception as e:
-            messages.error(request, f'Error processing CSV file: {str(e)}')
+            return reject(f'Error processing CSV file: {str(e)}')
+        
+        # The file is imported by the process_import_jobs worker; the upload
+        # only queues it and hands back the job id for progress polling.
+        # Without a worker (INVENTORY_IMPORT_INLINE) it is imported right here.
+        if settings.INVENTORY_IMPORT_INLINE:
+            job = run_import_job_inline(job)
+        
+        if wants_json:
+            return JsonResponse({
+                'success': True,
+                'job': job.to_dict(),
+                'status_url': reverse('import_job_status', args=[job.id]),
+            }, status=202)
+        
+        if job.is_finished:
+            messages.success(request, f'Import of "{job.original_name}" finished as job #{job.id}.')
+        else:
+            messages.success(request, f'Import of "{job.original_name}" queued as job #{job.id}.')
+        return redirect(f"{reverse('csv_import_view')}?job={job.id}")
     
     return redirect('dashboard')
 
+@login_required
+def import_job_status(request, job_id):
+    jobs = ImportJob.objects.all() if request.user.is_staff else ImportJob.objects.filter(user=request.user)
+    job = get_object_or_404(jobs, id=job_id)
+    return JsonResponse({'success': True, 'job': job.to_dict()})
+
 @login_required
 def csv_import_view(request):
-    return render(request, 'csv_import.html')
+    recent_jobs = ImportJob.objects.filter(user=request.user)[:5]
+    
+    active_job = None
+    job_id = request.GET.get('job')
+    if job_id and job_id.isdigit():
+        active_job = ImportJob.objects.filter(user=request.user, id=job_id).first()
+    
+    context = {
+        'recent_jobs': recent_jobs,
+        'active_job': active_job,
+    }
+    return render(request, 'csv_import.html', context)
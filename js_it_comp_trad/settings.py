@@ -20,8 +20,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.trading.middleware.RequestProfilingMiddleware',
+    'backend.trading.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'backend.trading.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -69,11 +71,101 @@ AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator', },
 ]
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# 'django.contrib.sessions.backends.db' (default), '...backends.cached_db'
+# (reads served from CACHES; needs a shared cache with several workers) or
+# '...backends.signed_cookies' (no session table writes at all)
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
 SESSION_COOKIE_AGE = 60 * 60 * 24
 
 SESSION_TIMEOUT = 3600
 
+# Serve the read-heavy pages from backend/trading/async_views.py. Only
+# worth enabling under ASGI (see "Serving modes" in README.md); under WSGI
+# each async view needs its own event loop.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Per-process memory by default; point CACHE_BACKEND/CACHE_LOCATION at e.g.
+# django.core.cache.backends.filebased.FileBasedCache and a directory to
+# share entries between workers
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='js-it-comp-trad'),
+    }
+}
+
+# Entries are keyed by the inventory version, so this only bounds how long
+# unused pages linger
+DASHBOARD_GRID_CACHE_TIMEOUT = config('DASHBOARD_GRID_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Sales analytics results are keyed by the sales facts watermark, so this too
+# only bounds how long unused slices linger
+SALES_ANALYTICS_CACHE_TIMEOUT = config('SALES_ANALYTICS_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Reorder forecasting (forecast_reorders): days of sales history read, the
+# half-life in days of the velocity's exponential weighting, supplier lead
+# time and days between orders, the service level z-score for safety stock
+# (1.65 ~ 95%), and the cover in days above which stock counts as overstock
+REORDER_LOOKBACK_DAYS = config('REORDER_LOOKBACK_DAYS', default=730, cast=int)
+REORDER_HALF_LIFE_DAYS = config('REORDER_HALF_LIFE_DAYS', default=28, cast=float)
+REORDER_LEAD_TIME_DAYS = config('REORDER_LEAD_TIME_DAYS', default=7, cast=int)
+REORDER_REVIEW_DAYS = config('REORDER_REVIEW_DAYS', default=7, cast=int)
+REORDER_SERVICE_Z = config('REORDER_SERVICE_Z', default=1.65, cast=float)
+REORDER_OVERSTOCK_DAYS = config('REORDER_OVERSTOCK_DAYS', default=180, cast=int)
+
+# last_activity is only rewritten once it is this many seconds old, so a
+# burst of requests costs one session write instead of one per request.
+# Inactivity logout may therefore trigger up to this much early.
+SESSION_ACTIVITY_GRANULARITY = config('SESSION_ACTIVITY_GRANULARITY', default=60, cast=int)
+
+# Server-Timing header and a JSON log line per request (see
+# RequestProfilingMiddleware). cProfile dumps go to REQUEST_PROFILING_DIR for
+# a random SAMPLE_RATE fraction of requests and, when SLOW_MS is above zero,
+# for every request slower than that; the SLOW_MS mode profiles all requests,
+# which roughly doubles their CPU time. Only the newest KEEP dumps are kept.
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+REQUEST_PROFILING_SLOW_MS = config('REQUEST_PROFILING_SLOW_MS', default=0, cast=int)
+REQUEST_PROFILING_DIR = config('REQUEST_PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+REQUEST_PROFILING_KEEP = config('REQUEST_PROFILING_KEEP', default=200, cast=int)
+
+# Prometheus metrics served at /metrics. Scrapers authenticate with
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token only staff users
+# can read the endpoint. With several worker processes, point
+# PROMETHEUS_MULTIPROC_DIR at an empty directory shared by all of them
+# (cleared before each start) so their counters are merged at scrape time.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    # prometheus_client reads this from the environment when first imported
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend.trading.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+INVENTORY_IMPORT_BATCH_SIZE = config('INVENTORY_IMPORT_BATCH_SIZE', default=500, cast=int)
+INVENTORY_IMPORT_CHUNK_SIZE = config('INVENTORY_IMPORT_CHUNK_SIZE', default=2000, cast=int)
+# A running import job with no progress for this many seconds is assumed to
+# have lost its worker and is queued again
+IMPORT_JOB_STALE_SECONDS = config('IMPORT_JOB_STALE_SECONDS', default=600, cast=int)
+# Import uploaded CSV files inside the upload request instead of queueing
+# them for the process_import_jobs worker. On by default so plain runserver
+# setups work; turn it off wherever that worker runs (docker-compose does).
+INVENTORY_IMPORT_INLINE = config('INVENTORY_IMPORT_INLINE', default=True, cast=bool)
+
+# Dotted path to a search backend class; empty picks FTS5 (SQLite) or
+# tsvector/trigram (PostgreSQL) automatically
+INVENTORY_SEARCH_BACKEND = config('INVENTORY_SEARCH_BACKEND', default='')
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE     = 'Asia/Manila'
 USE_I18N      = True
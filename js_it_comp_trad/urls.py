@@ -12,21 +12,42 @@ from backend.trading.views import (
     edit_inventory_item, 
     delete_inventory_item,
     update_item_ajax,
+    batch_update_items,
     export_inventory_csv,
     import_inventory_csv,
     csv_import_view,
+    import_job_status,
     time_in,
     time_out,
     time_logs,
+    payroll_report,
     cashier,
+    cashier_typeahead,
     process_sale,
+    checkout_cart,
     sales_history,
+    sales_analytics,
+    reorder_report,
+    export_reorder_csv,
     export_sales_csv,
     buy_item,
     buy_history,
     export_buy_history_csv
 )
 
+from backend.trading.api import inventory_api
+from backend.trading.metrics import metrics_view
+
+if settings.ASYNC_VIEWS:
+    from backend.trading.async_views import (
+        dashboard,
+        time_logs,
+        cashier,
+        cashier_typeahead,
+        sales_history,
+        import_job_status
+    )
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -37,24 +58,36 @@ urlpatterns = [
     path('time/in/', time_in, name='time_in'),
     path('time/out/', time_out, name='time_out'),
     path('time/logs/', time_logs, name='time_logs'),
+    path('time/payroll/', payroll_report, name='payroll_report'),
 
     path('inventory/add/', add_inventory_item, name='add_inventory_item'),
     path('inventory/edit/<int:item_id>/', edit_inventory_item, name='edit_inventory_item'),
     path('inventory/delete/<int:item_id>/', delete_inventory_item, name='delete_inventory_item'),
     path('inventory/update/<int:item_id>/ajax/', update_item_ajax, name='update_item_ajax'),
+    path('inventory/update/batch/', batch_update_items, name='batch_update_items'),
 
     path('inventory/export/csv/', export_inventory_csv, name='export_inventory_csv'),
     path('inventory/import/csv/', import_inventory_csv, name='import_inventory_csv'),
     path('inventory/import/', csv_import_view, name='csv_import_view'),
+    path('inventory/import/jobs/<int:job_id>/', import_job_status, name='import_job_status'),
+    path('inventory/reorder/', reorder_report, name='reorder_report'),
+    path('inventory/reorder/export/csv/', export_reorder_csv, name='export_reorder_csv'),
+
+    path('api/inventory/', inventory_api, name='inventory_api'),
+
+    path('metrics', metrics_view, name='metrics'),
 
     path('buy/item/<int:item_id>/', buy_item, name='buy_item'),
     path('buy/history/', buy_history, name='buy_history'),
     path('buy/history/export/csv/', export_buy_history_csv, name='export_buy_history_csv'),
 
     path('cashier/', cashier, name='cashier'),
+    path('cashier/typeahead/', cashier_typeahead, name='cashier_typeahead'),
     path('cashier/sale/<int:item_id>/', process_sale, name='process_sale'),
+    path('cashier/checkout/', checkout_cart, name='checkout_cart'),
     path('cashier/sales/', sales_history, name='sales_history'),
     path('cashier/sales/export/csv/', export_sales_csv, name='export_sales_csv'),
+    path('analytics/sales/', sales_analytics, name='sales_analytics'),
 
     path('accounts/login/', login_view, name='login'),
 